@@ -0,0 +1,267 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import command_executer as ce
+from interpreter import interpret, get_board_inf, classify_row
+from map_module import Map, MapManager
+from variablemap import VariableMap, compile_targets
+from headless import load_maps
+
+'''
+성능 측정 도구 (표준 라이브러리만 사용)
+
+mapdata.json의 모든 맵과, 맵을 가로/세로로 반복해 키운 합성 보드에서
+interpret / get_board_inf / 각 명령 처리 함수 / Map.move_player /
+MapManager.undo·redo / render_diff 의 소요 시간을 재서 JSON으로 출력한다.
+시작 경로(menu)와 게임 모듈의 import 시간(python -X importtime)도 함께 기록한다.
+변경 전후 결과 파일을 비교하는 용도.
+
+사용 예
+    python bench.py --output before.json
+    python bench.py --scales 1,4 --number 50 --maps print,drop
+    python bench.py --imports-only
+'''
+
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+# import 시간을 잴 모듈: menu는 프로그램 시작 시, 나머지는 맵을 처음 실행할 때 불러옴
+IMPORT_MODULES = ('menu', 'game', 'map_module')
+# 메뉴가 뜨기 전에는 불러오지 않아야 하는 무거운 모듈
+HEAVY_MODULES = ('asyncio', 'concurrent.futures', 'threading', 'random', 'tempfile', 'pickle', 'hashlib')
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def scale_rows(rows: List[str], k: int) -> List[str]:
+    """맵을 가로 k번, 세로 k번 반복한 합성 보드를 만듭니다."""
+    if k == 1:
+        return list(rows)
+    W = max((len(row) for row in rows), default=0)
+    return [row.ljust(W) * k for row in rows] * k
+
+
+def measure(fn: Callable[[Any], Any], setup: Callable[[], Any], number: int) -> Dict[str, Any]:
+    """
+    setup()으로 준비한 인자로 fn을 number번 실행하고 실행 시간(µs) 통계를 반환합니다.
+    setup 시간은 포함하지 않습니다. 예외가 나면 그 메시지를 기록합니다.
+    """
+    samples: List[float] = []
+    for _ in range(number):
+        arg = setup()
+        t0 = time.perf_counter()
+        try:
+            fn(arg)
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return {
+        'n': number,
+        'min_us': round(min(samples), 3),
+        'median_us': round(statistics.median(samples), 3),
+        'mean_us': round(statistics.fmean(samples), 3),
+    }
+
+
+def import_time(module: str, runs: int = 3) -> Dict[str, Any]:
+    """
+    새 인터프리터에서 `import module`을 실행해 -X importtime 결과를 모읍니다.
+    runs번 중 가장 빠른 결과를 사용합니다.
+    """
+    best: Optional[Dict[str, Any]] = None
+    here = os.path.dirname(os.path.abspath(__file__))
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+            capture_output=True, text=True, encoding='utf-8', cwd=here
+        )
+        rows = []
+        for line in proc.stderr.splitlines():
+            m = _IMPORTTIME_LINE.match(line)
+            if m:
+                rows.append((m.group(4), int(m.group(1)), int(m.group(2))))
+        if not rows:
+            return {'error': proc.stderr.strip().splitlines()[-1:] or 'no output'}
+        total = next(cumulative for name, _, cumulative in reversed(rows) if name == module)
+        if best is None or total < best['total_us']:
+            loaded = {name for name, _, _ in rows}
+            best = {
+                'total_us': total,
+                'modules': len(rows),
+                'heavy': [name for name in HEAVY_MODULES if name in loaded],
+                # 자체 시간이 큰 모듈 순
+                'top_self_us': [[name, own] for name, own, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:10]],
+            }
+    return best
+
+
+def _pick_chars(map: Map) -> Tuple[str, str]:
+    """명령 인자로 쓸 글자 두 개: 보드에서 가장 많은 글자 (빈칸, ';', '#' 제외)"""
+    counts = Counter(''.join(map.board))
+    chars = [ch for ch, _ in counts.most_common() if ch not in ' ;#'] + ['a', 'b']
+    return chars[0], chars[1] if chars[1] != chars[0] else chars[2]
+
+
+def _player_pos(map: Map) -> Tuple[int, int]:
+    players = map.find_players()
+    return players[0] if players else (0, 0)
+
+
+def _teleport_map(base: Map) -> Map:
+    """
+    teleport 측정용 보드: base와 같은 크기에 teleport("x"); 문장과 맨 아래 줄의 목표 글자 x만 둠
+    (맵 원본에는 teleport 옆에 ';'가 없어서 그대로 실행하면 주인공 위치를 못 찾음)
+    """
+    statement = 'teleport("x");'
+    W, H = max(base.W, len(statement) + 2), max(base.H, 3)
+    rows = [statement.ljust(W)] + [' ' * W] * (H - 2) + [' ' * (W - 2) + 'x ']
+    return Map('teleport', rows, None, highlight=False)
+
+
+def bench_commands(base: Map, number: int) -> Dict[str, Any]:
+    """command_executer의 각 명령을 base 맵의 사본에서 실행합니다."""
+    a, b = _pick_chars(base)
+    pos = _player_pos(base)
+    setup = base.snapshot
+    cases: Dict[str, Callable[[Map], Any]] = {
+        'drop': lambda m: ce.drop(m, a),
+        'lift': lambda m: ce.lift(m, a),
+        'print': lambda m: ce.print_text(m, pos, "hello"),
+        'scramble': lambda m: ce.scramble_oh(m, [a + b], None),
+        'swap': lambda m: ce.swap(m, [a, b], None),
+        'delete': lambda m: ce.delete(m, [a], None),
+        'switch': lambda m: ce.switch(m, [a, b], None),
+        'explode': lambda m: ce.explode(m, a),
+        'inverse': lambda m: ce.inverse(m, pos, "hello"),
+    }
+    results = {name: measure(fn, setup, number) for name, fn in cases.items()}
+    results['teleport'] = measure(
+        lambda m: ce.teleport_oh(m, ['x'], None), _teleport_map(base).snapshot, number)
+    results['assignment'] = measure(
+        lambda vm: ce.assignment(vm, compile_targets(['x', 'y']), 1), VariableMap, number)
+    return results
+
+
+def bench_history(base: Map, number: int) -> Dict[str, Any]:
+    """MapManager.undo / redo. 미리 몇 번 이동해 히스토리를 만든 뒤 번갈아 실행합니다."""
+    manager = MapManager(base.snapshot(), auto_render=False)
+    try:
+        for dx, dy in DIRECTIONS:
+            try:
+                manager.move_and_execute(dx, dy)
+            except RecursionError:
+                pass
+        undo: List[float] = []
+        redo: List[float] = []
+        for _ in range(number):
+            for op, samples in ((manager.undo, undo), (manager.redo, redo)):
+                t0 = time.perf_counter()
+                op()
+                samples.append((time.perf_counter() - t0) * 1e6)
+                # 다음 측정에 방해되지 않도록 예측 계산은 바로 취소
+                manager._clear_future()
+        return {name: {
+            'n': number,
+            'min_us': round(min(s), 3),
+            'median_us': round(statistics.median(s), 3),
+            'mean_us': round(statistics.fmean(s), 3),
+        } for name, s in (('undo', undo), ('redo', redo))}
+    finally:
+        manager._clear_future()
+
+
+def bench_render(base: Map, number: int) -> Dict[str, Any]:
+    """두 상태(이동 전/후)를 번갈아 render_diff 합니다. 출력은 버립니다."""
+    before = base.snapshot()
+    after = base.snapshot()
+    try:
+        after.move_and_execute(1, 0)
+    except RecursionError:
+        pass
+    frames = [(after.board.copy(), list(after.board_inf)), (before.board.copy(), list(before.board_inf))]
+    manager = MapManager(before, auto_render=False)
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        manager.render_all("", *frames[1])
+        turn = iter(range(number * 2))
+
+        def setup():
+            sink.seek(0)
+            sink.truncate()
+            return frames[next(turn) % 2]
+        return {
+            'render_all': measure(lambda f: manager.render_all("", *f), lambda: frames[0], number),
+            'render_diff': measure(lambda f: manager.render_diff("", *f), setup, number),
+        }
+
+
+def bench_map(entry: Dict[str, Any], scale: int, number: int) -> Dict[str, Any]:
+    rows = scale_rows(entry.get('data', []), scale)
+    base = Map(entry['name'], rows, entry.get('returnValue'), entry.get('stepLimit'))
+    report: Dict[str, Any] = {'map': entry['name'], 'scale': scale, 'H': base.H, 'W': base.W}
+    try:
+        base.initialize()
+    except RecursionError as e:
+        report['error'] = str(e)
+        return report
+
+    timings: Dict[str, Any] = {
+        'interpret': measure(interpret, base.snapshot, number),
+        'get_board_inf': measure(get_board_inf, lambda: base, number),
+        # 줄 분류 캐시를 비운 상태
+        'get_board_inf_cold': measure(get_board_inf, lambda: (classify_row.cache_clear(), base)[1], number),
+    }
+    for dx, dy in DIRECTIONS:
+        timings[f'move_player_{dx}_{dy}'] = measure(lambda m: m.move_player(dx, dy), base.snapshot, number)
+    timings.update({f'cmd_{name}': r for name, r in bench_commands(base, number).items()})
+    timings.update(bench_history(base, number))
+    timings.update(bench_render(base, number))
+    report['bench'] = timings
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="인터프리터/분류기/명령/렌더러 성능을 측정합니다.")
+    parser.add_argument('--mapdata', default="mapdata.json", help="맵 데이터 파일 (기본: mapdata.json)")
+    parser.add_argument('--maps', help="측정할 맵 이름 (쉼표로 구분, 기본: 전부)")
+    parser.add_argument('--scales', default="1,4", help="합성 보드 배율 (쉼표로 구분, 기본: 1,4)")
+    parser.add_argument('--number', type=int, default=20, help="항목마다 반복 횟수 (기본: 20)")
+    parser.add_argument('--output', help="결과 JSON 파일 (기본: 표준 출력)")
+    parser.add_argument('--imports-only', action='store_true', help="import 시간만 측정")
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.imports_only:
+        maps = load_maps(args.mapdata)
+        names = args.maps.split(',') if args.maps else list(maps)
+        scales = [int(s) for s in args.scales.split(',')]
+        for name in names:
+            for scale in scales:
+                print(f"{name} x{scale}", file=sys.stderr)
+                results.append(bench_map(maps[name], scale, args.number))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'number': args.number,
+        'import_time': {module: import_time(module) for module in IMPORT_MODULES},
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+from typing import Iterable, Iterator, List
+
+
+class Board:
+    """
+    맵 보드 저장소.
+    줄마다 변경 불가능한 문자열 하나로 보관하므로 board[y]가 곧 줄 문자열이고,
+    board[y][x]는 한 글자입니다.
+    copy()는 줄 목록을 공유하다가 어느 한쪽이 처음 쓸 때만 목록을 복제합니다.
+    """
+    __slots__ = ('_rows', '_shared')
+
+    def __init__(self, rows: Iterable = ()):
+        if isinstance(rows, Board):
+            rows = rows._rows
+        self._rows: List[str] = [row if isinstance(row, str) else ''.join(row) for row in rows]
+        self._shared = False
+
+    def __getitem__(self, y):
+        return self._rows[y]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Board):
+            return self._rows == other._rows
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Board({self._rows!r})"
+
+    def copy(self) -> 'Board':
+        """줄 목록을 공유하는 복사본을 O(1)로 만듭니다."""
+        clone = Board.__new__(Board)
+        clone._rows = self._rows
+        clone._shared = self._shared = True
+        return clone
+
+    def __copy__(self) -> 'Board':
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> 'Board':
+        # 줄 문자열은 변경 불가능하므로 얕은 복사로 충분함
+        return self.copy()
+
+    def _own(self) -> None:
+        """공유 중인 줄 목록을 쓰기 전에 복제합니다."""
+        if self._shared:
+            self._rows = list(self._rows)
+            self._shared = False
+
+    def set(self, x: int, y: int, ch: str) -> bool:
+        """board[y][x]를 ch로 바꿉니다. 실제로 바뀌었으면 True."""
+        row = self._rows[y]
+        if row[x] == ch:
+            return False
+        self._own()
+        self._rows[y] = row[:x] + ch + row[x + 1:]
+        return True
+
+    def set_row(self, y: int, text: str) -> bool:
+        """y번째 줄을 text로 바꿉니다. 실제로 바뀌었으면 True."""
+        if self._rows[y] == text:
+            return False
+        self._own()
+        self._rows[y] = text
+        return True
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+'''
+맵 목록과 진행 상황 저장
+
+MapCatalog
+    mapdata.json에서 맵 이름과 메타데이터(locked, returnValue, stepLimit)만 읽어 색인을 만들고,
+    각 맵의 보드(data)는 파일 안의 바이트 위치만 기억해 두었다가 선택될 때 그 부분만 읽어 파싱한다.
+    색인을 만들 때도 data 배열은 정규식으로 위치만 찾아 건너뛰므로 줄 문자열을 만들지 않는다.
+
+ProgressStore
+    잠금 해제 기록을 mapdata.json과 별도인 작은 파일(progress.json)에 저장한다.
+    임시 파일에 쓴 뒤 os.replace로 바꿔치기하므로 쓰는 도중 종료되어도 파일이 깨지지 않는다.
+'''
+
+# "data": [ "...", "...", ... ] 의 배열 부분 (문자열 안의 이스케이프 포함)
+_DATA_PATTERN = re.compile(rb'("data"\s*:\s*)(\[\s*(?:"(?:[^"\\]|\\.)*"\s*(?:,\s*"(?:[^"\\]|\\.)*"\s*)*)?\])')
+
+
+class MapInfo(NamedTuple):
+    name: str
+    locked: bool
+    returnValue: Any
+    stepLimit: Optional[int]
+    offset: int     # data 배열의 파일 내 바이트 위치
+    length: int
+
+
+class MapCatalog:
+    def __init__(self, mapdata_file: str = "mapdata.json"):
+        self.mapdata_file = mapdata_file
+        self._index: Dict[str, MapInfo] = {}
+        # 정규식으로 위치를 못 찾은 data(문자열이 아닌 값 등)는 파싱된 그대로 보관
+        self._inline: Dict[str, List[str]] = {}
+        self._stamp = None
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """data 배열을 순번으로 바꾼 뼈대만 json으로 읽어 색인을 만듭니다."""
+        with open(self.mapdata_file, 'rb') as f:
+            raw = f.read()
+            self._stamp = self._file_stamp(f.fileno())
+
+        spans = []
+
+        def placeholder(m: 're.Match') -> bytes:
+            spans.append((m.start(2), m.end(2) - m.start(2)))
+            return m.group(1) + str(len(spans) - 1).encode()
+
+        skeleton = json.loads(_DATA_PATTERN.sub(placeholder, raw))
+        index: Dict[str, MapInfo] = {}
+        inline: Dict[str, List[str]] = {}
+        for m in skeleton.get('maps', []):
+            name = m.get('name')
+            if not name:
+                continue
+            span = m.get('data', [])
+            if isinstance(span, int):
+                offset, length = spans[span]
+            else:
+                offset, length = -1, 0
+                inline[name] = span
+            index[name] = MapInfo(name, m.get('locked', True), m.get('returnValue', None),
+                                  m.get('stepLimit', None), offset, length)
+        self._index = index
+        self._inline = inline
+
+    @staticmethod
+    def _file_stamp(fd: int):
+        st = os.fstat(fd)
+        return st.st_size, st.st_mtime_ns
+
+    @property
+    def titles(self) -> List[str]:
+        return list(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def info(self, name: str) -> MapInfo:
+        return self._index[name]
+
+    def load_raw(self, name: str) -> bytes:
+        """name 맵의 data 배열을 파싱하지 않은 JSON 바이트 그대로 읽습니다."""
+        info = self._index[name]
+        if info.offset >= 0:
+            with open(self.mapdata_file, 'rb') as f:
+                if self._file_stamp(f.fileno()) != self._stamp:
+                    # 파일이 바뀌었으면 색인을 다시 만들고 위치를 새로 찾음
+                    self._build_index()
+                    info = self._index[name]
+                if info.offset >= 0:
+                    f.seek(info.offset)
+                    return f.read(info.length)
+        return json.dumps(self._inline[name], ensure_ascii=False).encode()
+
+    def load_data(self, name: str) -> List[str]:
+        """name 맵의 보드 줄 목록을 파일에서 그 부분만 읽어 반환합니다."""
+        return json.loads(self.load_raw(name))
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 os.replace로 바꿔치기합니다. 쓰는 도중 종료되어도 기존 파일은 그대로 남습니다."""
+    import tempfile   # 쓸 때만 필요하므로 시작 시간에 포함하지 않음
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ProgressStore:
+    def __init__(self, progress_file: str = "progress.json"):
+        self.progress_file = progress_file
+        self.unlocked: Set[str] = set()
+        try:
+            with open(progress_file, 'r', encoding='utf-8') as f:
+                self.unlocked = set(json.load(f).get('unlocked', []))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"진행 상황 로드 실패: {e}")
+
+    def is_unlocked(self, name: str) -> bool:
+        return name in self.unlocked
+
+    def unlock(self, name: str) -> None:
+        """name을 잠금 해제 목록에 추가하고 파일에 저장합니다."""
+        if name in self.unlocked:
+            return
+        self.unlocked.add(name)
+        self._save()
+
+    def _save(self) -> None:
+        data = json.dumps({'unlocked': sorted(self.unlocked)}, ensure_ascii=False, indent=2)
+        atomic_write(self.progress_file, data.encode('utf-8'))
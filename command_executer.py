@@ -1,15 +1,34 @@
-from typing import TYPE_CHECKING, Tuple
+import re
+from typing import TYPE_CHECKING, Dict, List, Tuple
 if TYPE_CHECKING:
     from map_module import Map
     from variablemap import VariableMap
 
 
+_NON_EMPTY = re.compile(r"[^ ]")
+
+
+def _find_all(board, text: str) -> Dict[int, List[int]]:
+    """줄마다 text가 시작하는 x 목록을 str.find로 찾는다 (겹치는 위치 포함)."""
+    occ: Dict[int, List[int]] = {}
+    for y, row in enumerate(board):
+        x = row.find(text)
+        if x == -1:
+            continue
+        xs = occ[y] = []
+        while x != -1:
+            xs.append(x)
+            x = row.find(text, x + 1)
+    return occ
+
+
 def drop(map: 'Map', text: str) -> Tuple[bool, bool]:
     """
     board에 있는 `text` 전부를 아래로 떨어뜨린다.
     - 같은 줄에 연속으로 있는 정확한 문자열만 대상으로 함
     - 밑에 다른 문자가 있거나 보드 바닥에 닿으면 멈춤
-    - 하나라도 움직였으면 changed=True
+    - 아래 줄부터 한 번 훑으면서 열마다 가장 가까운 장애물 높이를 갱신하고,
+      바뀐 줄은 마지막에 한꺼번에 반영함
     반환: (changed, True)
     """
     if not text:
@@ -20,42 +39,44 @@ def drop(map: 'Map', text: str) -> Tuple[bool, bool]:
     H, W = map.H, map.W
 
     # 1) 모든 occurrence 수집
-    occ = []
-    for y in range(H):
-        for x in range(W - L + 1):
-            if ''.join(board[y][x:x + L]) == text:
-                occ.append((x, y))
+    occ = _find_all(board, text)
+    if not occ:
+        return True
 
     # 2) 아래쪽부터 처리(충돌 계산을 단순화)
-    occ.sort(key=lambda p: p[1], reverse=True)
-
-    changed = False
-    for x, y in occ:
-        # 다른 이동 때문에 이미 지워졌을 수도 있으니 다시 확인
-        if ''.join(board[y][x:x + L]) != text:
-            continue
+    below = [H] * W   # 열마다 처리 중인 줄보다 아래에 있는 가장 가까운 장애물의 y
+    rows: Dict[int, List[str]] = {}   # 이번 호출에서 바뀐 줄
+    for y in range(H - 1, min(occ) - 1, -1):
+        line = board[y]
+        if y in occ:
+            cur = rows[y] = list(line)
+            for x in occ[y]:
+                # 다른 이동 때문에 이미 지워졌을 수도 있으니 다시 확인
+                if ''.join(cur[x:x + L]) != text:
+                    continue
 
-        # 2-1) 떨어질 수 있는 최대 거리 계산
-        dist = 0
-        while True:
-            ny = y + dist + 1
-            if ny >= H:                    # 바닥
-                break
-            # 아래 칸들이 모두 빈칸인지 확인
-            blocked = any(board[ny][x + i] != map.EMPTY for i in range(L))
-            if blocked:
-                break
-            dist += 1
-
-        if dist == 0:
-            continue  # 이미 바로 밑이 막혀 있음
-
-        # 2-2) 문자 이동
-        changed = True
-        for i in range(L):                 # 원래 위치 지우기
-            board[y][x + i] = map.EMPTY
-        for i, ch in enumerate(text):      # 새로운 위치 채우기
-            board[y + dist][x + i] = ch
+                # 2-1) 떨어질 수 있는 최대 거리 = 가장 높은 장애물 바로 위까지
+                dist = min(below[x:x + L]) - y - 1
+                if dist == 0:
+                    continue  # 이미 바로 밑이 막혀 있음
+
+                # 2-2) 문자 이동
+                cur[x:x + L] = map.EMPTY * L   # 원래 위치 지우기
+                dest = rows.get(y + dist)
+                if dest is None:
+                    dest = rows[y + dist] = list(board[y + dist])
+                for i, ch in enumerate(text):  # 새로운 위치 채우기
+                    dest[x + i] = ch
+                    if ch != map.EMPTY:
+                        below[x + i] = y + dist
+            line = ''.join(cur)
+        # 이 줄의 글자들이 위쪽 줄의 장애물이 됨
+        for m in _NON_EMPTY.finditer(line):
+            below[m.start()] = y
+
+    # 3) 바뀐 줄을 한 번에 반영
+    for y, cur in rows.items():
+        map.set_row(y, cur)
 
     return True
 def print_text(map:'Map',pos:tuple,text:str):
@@ -64,35 +85,40 @@ def print_text(map:'Map',pos:tuple,text:str):
         if 0 <= tx < map.W and 0 <= ty < map.H:
             if map.board[ty][tx] == '#' or map.board[ty][tx] == ';':
                 continue
-            map.board[ty][tx] = ch
+            map.set_cell(tx, ty, ch)
     return True
-def assignment(variable_map:'VariableMap',operand_list:list,value):
-    for i in range(len(operand_list)-1,-1,-1):
-        if operand_list[i].isalpha():
-            variable_map.set_variable(operand_list[i], value)
-        else:
-            raise SyntaxError(f"Invalid variable name: {operand_list[i]}")
+def assignment(variable_map:'VariableMap',targets:tuple,value):
+    """
+    targets: variablemap.compile_targets 결과 (오른쪽부터의 슬롯 목록, 잘못된 이름 또는 None)
+    이름 검사는 컴파일할 때 끝났으므로 여기서는 슬롯에 값만 기록한다.
+    """
+    slots, invalid = targets
+    for slot in slots:
+        variable_map.store(slot, value)
+    if invalid is not None:
+        raise SyntaxError(f"Invalid variable name: {invalid}")
     return True
 # ⬇️ 이호영님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
 # ⬇️ 오유민님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-import random
-
 def scramble_oh(map, args, out):
     """
     맵의 각 줄에서 주어진 target 문자열을 찾아 글자를 무작위로 섞은 후 교환
+    난수는 현재 보드 내용과 target으로 시드를 정하므로 같은 상태에서는 항상 같은 결과가 나온다.
     """
+    import random   # scramble을 쓰는 맵에서만 필요
     target = args[0]
+    rng = random.Random('\n'.join(map.board) + '\0' + target)
 
     for y in range(map.H):
-       line = ''.join(map.board[y])
+       line = map.board[y]
 
        if target in line:
             # 글자 섞기
             scrambled = list(target)
-            random.shuffle(scrambled)
+            rng.shuffle(scrambled)
             scrambled_str = ''.join(scrambled)
             line = line.replace(target, scrambled_str)
-            map.board[y] = list(line)  # 문자열 → 리스트 (리스트 유지!)
+            map.set_row(y, line)
 
     return True
 
@@ -101,48 +127,32 @@ def teleport_oh(map, args, out):
     함수 안의 문자 확인 후 맵 훑어보고 같은 문자가 있는 경우 그 문자 옆으로 주인공(;) 위치 이동
     """
     target = args[0]
-    new_board = [list(row) for row in map.board]
-    height = len(new_board)
-    width = len(new_board[0]) if height > 0 else 0
+    board = map.board
+    height, width = map.H, map.W
 
-    f = 0
     # 주인공 위치 찾기
-    for y in range(height):
-        for x in range(width):
-            if new_board[y][x] == ";" and new_board[y][x-6] == "t": #teleport(\" \") = 맵제작_기본함수틀
-                hero_pos = (y, x)
-                f = 1
-                break#첫 번째로 발견된 ; 위치만 기억
-        if f == 1:
-            break  # hero_pos를 찾았으면 y 루프도 종료
-
-    # 맵 전체 탐색: target 문자 찾기
-    found = False
-    for y in range(height):
-        for x in range(width):
-            if new_board[y][x] == target:
-                # 같은 라인에 있는 경우는 제외(함수 안 문자 옆으로 이동 방지)
-                if hero_pos and (y == hero_pos[0]):
-                    continue
-                # 주변 좌표 확인 (왼쪽, 오른쪽, 위, 아래)
-                directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-                for dy, dx in directions:
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < height and 0 <= nx < width:
-                        if new_board[ny][nx] == " ":  # 빈 칸일 때
-                            # 기존 위치 비우기
-                            hy, hx = hero_pos
-                            new_board[hy][hx] = " "
-                            # 새로운 위치로 이동
-                            new_board[ny][nx] = ";"
-                            found = True
-                            break
-                if found:
-                    break
-        if found:
-            break
-
-    map.board = new_board
+    for x, y in map.positions(";"):
+        if board[y][x-6] == "t": #teleport(\" \") = 맵제작_기본함수틀
+            hero_pos = (y, x)
+            break#첫 번째로 발견된 ; 위치만 기억
+
+    # target 문자가 있는 칸만 위에서부터 확인 (위치 색인 사용)
+    for x, y in map.positions(target):
+        # 같은 라인에 있는 경우는 제외(함수 안 문자 옆으로 이동 방지)
+        if hero_pos and (y == hero_pos[0]):
+            continue
+        # 주변 좌표 확인 (왼쪽, 오른쪽, 위, 아래)
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        for dy, dx in directions:
+            ny, nx = y + dy, x + dx
+            if 0 <= ny < height and 0 <= nx < width:
+                if board[ny][nx] == " ":  # 빈 칸일 때
+                    # 기존 위치 비우고 새로운 위치로 이동
+                    hy, hx = hero_pos
+                    map.set_cell(hx, hy, " ")
+                    map.set_cell(nx, ny, ";")
+                    return True
+
     return True
 
 # ⬇️ 이기상님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
@@ -151,19 +161,14 @@ def swap(map: 'Map', args: list, out) -> bool:
     map.board 전체에서 문자 a를 b로 전역적으로 교환한다.
     """
     a, b = args
-    board = map.board
-    H, W = map.H, map.W
-
-    # 보드 복사하면서 교환
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == a:
-                board[y][x] = '__TEMP__'
-
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == '__TEMP__':
-                board[y][x] = b
+    if not _is_char(a):
+        return True  # 한 글자가 아니면 보드에 있을 수 없음
+    if not _is_char(b):
+        raise SyntaxError(f"한 글자만 쓸 수 있습니다: {b!r}")
+
+    # a가 있는 줄만 줄 문자열 단위로 치환
+    for y in map.rows_containing(a):
+        map.set_row(y, map.board[y].replace(a, b))
     
     return True
 def delete(map: 'Map', args: list, out) -> bool:
@@ -173,40 +178,29 @@ def delete(map: 'Map', args: list, out) -> bool:
     if not args:
         raise SyntaxError("delete 명령은 delete(char) 형식이어야 합니다")
     target = args[0]
+    if not _is_char(target):
+        return True  # 한 글자가 아니면 보드에 있을 수 없음
 
-    board = map.board
-    H, W = map.H, map.W
-
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == target:
-                board[y][x] = " "
+    for y in map.rows_containing(target):
+        map.set_row(y, map.board[y].replace(target, " "))
 
     return True
+def _is_char(value) -> bool:
+    """보드 한 칸에 들어갈 수 있는 값(한 글자 문자열)인지 확인"""
+    return isinstance(value, str) and len(value) == 1
 # ⬇️ 이현우님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
 def switch(map: 'Map', args: list, out) -> bool:
     """
     map.board 전체에서 문자 a와 b를 서로 교환한다.
     """
     a, b = args
-    c = b
-    d = a
-    board = map.board
-    H, W = map.H, map.W
+    if not (_is_char(a) and _is_char(b)):
+        raise SyntaxError(f"한 글자만 쓸 수 있습니다: {a!r}, {b!r}")
+    table = {ord(a): b, ord(b): a}
 
-    # 보드 복사하면서 교환
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == a:
-                board[y][x] = '__TEMP__'
-            elif board[y][x] == b:
-                board[y][x] = '__TEMP2__'
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == '__TEMP__':
-                board[y][x] = c
-            elif board[y][x] == '__TEMP2__':
-                board[y][x] = d
+    # a나 b가 있는 줄만 줄 문자열 단위로 두 문자를 동시에 교환
+    for y in sorted(set(map.rows_containing(a)) | set(map.rows_containing(b))):
+        map.set_row(y, map.board[y].translate(table))
     
     return True
 
@@ -216,6 +210,8 @@ def lift(map: 'Map', text: str) -> Tuple[bool, bool]:
     - 같은 줄에 연속으로 있는 정확한 문자열만 대상으로 함
     - 위에 다른 문자가 있거나 보드 위에 닿으면 멈춤
     - 하나라도 움직였으면 changed=True
+    - 위 줄부터 한 번 훑으면서 열마다 가장 가까운 장애물 높이를 갱신하고,
+      바뀐 줄은 마지막에 한꺼번에 반영함
     반환: (changed, True)
     """
     if not text:
@@ -226,41 +222,46 @@ def lift(map: 'Map', text: str) -> Tuple[bool, bool]:
     H, W = map.H, map.W
 
     # 1) 모든 occurrence 수집
-    occ = []
-    for y in range(H):
-        for x in range(W - L + 1):
-            if ''.join(board[y][x:x + L]) == text:
-                occ.append((x, y))
+    occ = _find_all(board, text)
+    if not occ:
+        return False, True
 
     # 2) 위쪽부터 처리 (충돌 계산을 단순화)
-    occ.sort(key=lambda p: p[1])
-
+    above = [-1] * W   # 열마다 처리 중인 줄보다 위에 있는 가장 가까운 장애물의 y
+    rows: Dict[int, List[str]] = {}   # 이번 호출에서 바뀐 줄
     changed = False
-    for x, y in occ:
-        # 다른 이동 때문에 이미 지워졌을 수도 있으니 다시 확인
-        if ''.join(board[y][x:x + L]) != text:
-            continue
+    for y in range(0, max(occ) + 1):
+        line = board[y]
+        if y in occ:
+            cur = rows[y] = list(line)
+            for x in occ[y]:
+                # 다른 이동 때문에 이미 지워졌을 수도 있으니 다시 확인
+                if ''.join(cur[x:x + L]) != text:
+                    continue
 
-        # 2-1) 들어올릴 수 있는 최대 거리 계산
-        dist = 0
-        while True:
-            ny = y - dist - 1
-            if ny < 0:  # 위쪽 벽
-                break
-            blocked = any(board[ny][x + i] != map.EMPTY for i in range(L))
-            if blocked:
-                break
-            dist += 1
-
-        if dist == 0:
-            continue  # 이미 바로 위가 막혀 있음
-
-        # 2-2) 문자 이동
-        changed = True
-        for i in range(L):                 # 원래 위치 지우기
-            board[y][x + i] = map.EMPTY
-        for i, ch in enumerate(text):      # 새로운 위치 채우기
-            board[y - dist][x + i] = ch
+                # 2-1) 들어올릴 수 있는 최대 거리 = 가장 낮은 장애물 바로 아래까지
+                dist = y - max(above[x:x + L]) - 1
+                if dist == 0:
+                    continue  # 이미 바로 위가 막혀 있음
+
+                # 2-2) 문자 이동
+                changed = True
+                cur[x:x + L] = map.EMPTY * L   # 원래 위치 지우기
+                dest = rows.get(y - dist)
+                if dest is None:
+                    dest = rows[y - dist] = list(board[y - dist])
+                for i, ch in enumerate(text):  # 새로운 위치 채우기
+                    dest[x + i] = ch
+                    if ch != map.EMPTY:
+                        above[x + i] = y - dist
+            line = ''.join(cur)
+        # 이 줄의 글자들이 아래쪽 줄의 장애물이 됨
+        for m in _NON_EMPTY.finditer(line):
+            above[m.start()] = y
+
+    # 3) 바뀐 줄을 한 번에 반영
+    for y, cur in rows.items():
+        map.set_row(y, cur)
 
     return changed, True
 
@@ -272,23 +273,18 @@ def explode(map: 'Map', ch: str) -> bool:
     if not ch:
         return False  # 문자가 없으면 아무 작업도 하지 않음
 
-    board = map.board
     H, W = map.H, map.W
-    positions = []
 
-    # 주어진 문자의 위치를 모두 찾음
-    for y in range(H):
-        for x in range(W):
-            if board[y][x] == ch:
-                positions.append((y, x))
+    # 주어진 문자의 위치를 모두 찾음 (위치 색인 사용)
+    positions = map.positions(ch)
 
     # 각 위치를 중심으로 3x3 범위 내의 블록을 제거
-    for y, x in positions:
+    for x, y in positions:
         for dy in [-1, 0, 1]:
             for dx in [-1, 0, 1]:
                 ny, nx = y + dy, x + dx
                 if 0 <= ny < H and 0 <= nx < W:
-                    board[ny][nx] = map.EMPTY  # 빈 공간으로 설정
+                    map.set_cell(nx, ny, map.EMPTY)  # 빈 공간으로 설정
 
     return True  
 
@@ -305,7 +301,7 @@ def inverse(map:'Map', pos:tuple, text:str):
         if 0 <= tx < map.W and 0 <= ty < map.H:
             if map.board[ty][tx] == '#' or map.board[ty][tx] == ';':
                 continue  # 벽이면 건너뜀
-            map.board[ty][tx] = ch  # 문자를 보드에 기록
+            map.set_cell(tx, ty, ch)  # 문자를 보드에 기록
 
     return True
 
@@ -1,5 +1,8 @@
-import command_executer as ce  
-from typing import TYPE_CHECKING
+import command_executer as ce
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Tuple
+from variablemap import compile_expression, compile_targets, Evaluator
+from stats import STATS
 if TYPE_CHECKING:
     from map_module import Map
     from variablemap import VariableMap
@@ -8,82 +11,177 @@ if TYPE_CHECKING:
 '''
 명령어를 분류하고 분해만 하는 함수
 처리는 command_executer.py에서 함
+
+명령 이름 → (처리 함수, 인자 형식)을 COMMANDS에 등록해 두고,
+코드 문자열마다 한 번만 분해(parse_command)한 결과를 캐시하여 재사용한다.
+'='가 들어 있는 코드는 원래 순서대로 return/return_/drop/print만 명령으로 보고
+나머지 명령 이름이면 변수 대입으로 처리한다. (예: lift("=")는 대입 시도)
 '''
-def parse_and_execute_command(map:'Map',variable_map:'VariableMap',code, pos:tuple):
+
+
+class Command(NamedTuple):
+    handler: Callable[..., Any]                    # (map, variable_map, pos, *인자값) -> bool
+    parse_args: Callable[[str], Tuple[Evaluator, ...]]  # 괄호 안 문자열 → 인자 평가 함수들
+    before_assignment: bool                        # 코드에 '='가 있어도 대입보다 먼저 명령으로 처리
+
+
+class ParsedCommand(NamedTuple):
+    handler: Callable[..., Any]
+    args: Tuple[Evaluator, ...]
+    name: str                                      # 통계에 표시할 명령 이름
+
+
+COMMANDS: Dict[str, Command] = {}
+
+
+def command(name: str, parse_args: Callable[[str], Tuple[Evaluator, ...]], before_assignment: bool = False):
+    """처리 함수를 name 명령으로 등록하는 데코레이터"""
+    def register(handler):
+        COMMANDS[name] = Command(handler, parse_args, before_assignment)
+        return handler
+    return register
+
+
+# ───── 인자 형식 ─────
+def no_args(text: str) -> Tuple[Evaluator, ...]:
+    return ()
+
+
+def value_arg(text: str) -> Tuple[Evaluator, ...]:
+    """인자 하나를 get_value로 평가"""
+    return (compile_expression(text),)
+
+
+def text_arg(text: str) -> Tuple[Evaluator, ...]:
+    """인자 하나를 get_value로 평가한 뒤 문자열로 변환"""
+    evaluate = compile_expression(text)
+    return (lambda frame: str(evaluate(frame)),)
+
+
+def value_pair(text: str) -> Tuple[Evaluator, ...]:
+    """쉼표로 구분된 인자 두 개를 각각 get_value로 평가"""
+    parts = text.split(",")
+    if len(parts) != 2:
+        raise SyntaxError(f"인자가 두 개여야 합니다: {text}")
+    return tuple(compile_expression(part) for part in parts)
+
+
+def char_pair(text: str) -> Tuple[Evaluator, ...]:
+    """쉼표로 구분된 인자 두 개를 평가 없이 따옴표만 벗겨서 사용"""
+    parts = text.split(",")
+    if len(parts) != 2:
+        raise SyntaxError(f"인자가 두 개여야 합니다: {text}")
+    return tuple(_literal(part.strip().strip("'")) for part in parts)
+
+
+def _literal(value: str) -> Evaluator:
+    return lambda frame: value
+
+
+def _split_code(code: str) -> Tuple[Optional[str], str]:
+    """코드를 (명령 이름, 괄호 안 인자 문자열)로 나눈다. 명령 형태가 아니면 이름은 None."""
     if code == 'return':
-        if map.returnValue is None:
-            return False
-        else:
-            return True
+        return 'return', ''
     if code.startswith("return_"):
-        if variable_map.get_value(code[7:])==map.returnValue:
-            return False
-        else:
-            return True
-    
-    # move("..."), 문자열 길이 2 이상 지원
-    if code.startswith('drop(') and code.endswith(')'):
-        arg = code[5:-1]
-        text=variable_map.get_value(arg)
-        return ce.drop(map,str(text))
-    # print("..."), 인용부호 처리
-    if code.startswith('print(') and code.endswith(')'):
-        arg = code[6:-1]
-        text=variable_map.get_value(arg)
-        return ce.print_text(map,pos,str(text))
-    if '=' in code:
-        # 변수 대입 처리
-        operand_list = code.split('=')
-        last= operand_list[-1]
-        value= variable_map.get_value(last)
-        return ce.assignment(variable_map,operand_list[:-1],value)
-# ⬇️ 이호영님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-# ⬇️ 오유민님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-    if code.startswith('scramble(') and code.endswith(')'):
-        arg = code[9:-1]
-        text=variable_map.get_value(arg)
-        return ce.scramble_oh(map, [str(text)], None)
-    
-    if code.startswith('teleport(') and code.endswith(')'):
-        arg = code[9:-1]
-        text=variable_map.get_value(arg)
-        return ce.teleport_oh(map, [str(text)] , None)
+        return 'return_', code[7:]
+    paren = code.find('(')
+    if paren > 0 and code.endswith(')'):
+        return code[:paren], code[paren + 1:-1]
+    return None, code
 
-# ⬇️ 이기상님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-    if code.startswith('swap(') and code.endswith(')'):
-        args = code[5:-1]
-        a, b = [variable_map.get_value(x) for x in args.split(",")]
-        return ce.swap(map, [a, b], None)
-    if code.startswith('delete(') and code.endswith(')'):
-        arg = code[7:-1].strip()
 
-        char = variable_map.get_value(arg)
+@lru_cache(maxsize=1024)
+def parse_command(code: str) -> Optional[ParsedCommand]:
+    """
+    코드 문자열을 실행 가능한 형태로 분해한다. 결과는 코드 문자열별로 캐시된다.
+    실행할 수 없는 코드면 None을 반환한다.
+    """
+    name, arg_text = _split_code(code)
+    cmd = COMMANDS.get(name)
+    try:
+        if cmd is not None and (cmd.before_assignment or '=' not in code):
+            return ParsedCommand(cmd.handler, cmd.parse_args(arg_text), name)
+        if '=' in code:
+            # 변수 대입 처리: 마지막 피연산자가 값, 나머지는 대입 대상 (이름은 여기서 슬롯으로 바꿈)
+            operand_list = code.split('=')
+            targets = compile_targets(operand_list[:-1])
+            return ParsedCommand(_assign, (_literal(targets), compile_expression(operand_list[-1])), 'assign')
+    except SyntaxError:
+        pass
+    return None
 
-        return ce.delete(map, [char], None)
-# ⬇️ 이현우님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-    if code.startswith('switch(') and code.endswith(')'):
-        args = code[7:-1]
-        a, b = [x.strip().strip("'") for x in args.split(",")]
-        return ce.switch(map, [a, b], None)
-    if code.startswith('lift(') and code.endswith(')'):
-        arg = code[5:-1]
-        text=variable_map.get_value(arg)
-        return ce.lift(map,str(text))
-# ⬇️ Farhan Latiff님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
-    if code.startswith('explode(') and code.endswith(')'):
-        arg = code[8:-1].strip()
-        ch=variable_map.get_value(arg)
-        return ce.explode(map, ch)
-    
-    if code.startswith('inverse(') and code.endswith(')'):
-        arg = code[8:-1].strip() 
-        text = variable_map.get_value(arg)
-        return ce.inverse(map, pos, str(text)) 
+
+def parse_and_execute_command(map:'Map',variable_map:'VariableMap',code, pos:tuple):
+    parsed = parse_command(code)
+    if parsed is None:
+        # 실행할 수 없는 코드는 무시
+        return True
+    frame = variable_map.frame
+    start = STATS.start()
+    try:
+        return parsed.handler(map, variable_map, pos, *[arg(frame) for arg in parsed.args])
+    finally:
+        STATS.stop(parsed.name, start, map.stats_buffer)
+
+
+def _assign(map:'Map', variable_map:'VariableMap', pos:tuple, targets:tuple, value):
+    return ce.assignment(variable_map, targets, value)
 
 
+@command('return', no_args, before_assignment=True)
+def _return(map:'Map', variable_map:'VariableMap', pos:tuple):
+    if map.returnValue is None:
+        return False
+    else:
+        return True
 
+@command('return_', value_arg, before_assignment=True)
+def _return_value(map:'Map', variable_map:'VariableMap', pos:tuple, value):
+    if value == map.returnValue:
+        return False
+    else:
+        return True
 
-                
-        
-    raise SyntaxError(f"Unknown command: {code}")
+# move("..."), 문자열 길이 2 이상 지원
+@command('drop', text_arg, before_assignment=True)
+def _drop(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.drop(map, text)
+
+# print("..."), 인용부호 처리
+@command('print', text_arg, before_assignment=True)
+def _print(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.print_text(map, pos, text)
+# ⬇️ 이호영님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
+# ⬇️ 오유민님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
+@command('scramble', text_arg)
+def _scramble(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.scramble_oh(map, [text], None)
+
+@command('teleport', text_arg)
+def _teleport(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.teleport_oh(map, [text], None)
+
+# ⬇️ 이기상님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
+@command('swap', value_pair)
+def _swap(map:'Map', variable_map:'VariableMap', pos:tuple, a, b):
+    return ce.swap(map, [a, b], None)
+
+@command('delete', value_arg)
+def _delete(map:'Map', variable_map:'VariableMap', pos:tuple, char):
+    return ce.delete(map, [char], None)
+# ⬇️ 이현우님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
+@command('switch', char_pair)
+def _switch(map:'Map', variable_map:'VariableMap', pos:tuple, a:str, b:str):
+    return ce.switch(map, [a, b], None)
+
+@command('lift', text_arg)
+def _lift(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.lift(map, text)
+# ⬇️ Farhan Latiff님 작업 시작 위치 (이 아래에만 작성해 주세요. 이 주석은 나중에 병합 기준이 되므로 수정하지 마세요.)
+@command('explode', value_arg)
+def _explode(map:'Map', variable_map:'VariableMap', pos:tuple, ch):
+    return ce.explode(map, ch)
 
+@command('inverse', text_arg)
+def _inverse(map:'Map', variable_map:'VariableMap', pos:tuple, text:str):
+    return ce.inverse(map, pos, text)
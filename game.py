@@ -1,54 +1,26 @@
-import sys
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from map_module import Map,MapManager
+from 입력관련 import KeyReader
+from journal import SessionJournal
+from stats import STATS
 import os
+from typing import Optional
 
-# ────────── 키 입력 처리 (Windows / Unix) ──────────
-try:
-    import msvcrt
-    def get_key():
-        ch = msvcrt.getwch()
-        if ch == '\xe0':  # 화살표 키
-            ch2 = msvcrt.getwch()
-            return {'H': 'UP', 'P': 'DOWN', 'K': 'LEFT', 'M': 'RIGHT'}.get(ch2, '')
-        return ch
-    def key_pressed():
-        return msvcrt.kbhit()
-except ImportError:
-    import tty, termios, select
-    def get_key():
-        fd = sys.stdin.fileno()
-        old = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':  # 화살표 키
-                seq = sys.stdin.read(2)
-                return {'[A': 'UP', '[B': 'DOWN', '[D': 'LEFT', '[C': 'RIGHT'}.get(seq, '')
-            return ch
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old)
-    def key_pressed():
-        dr, _, _ = select.select([sys.stdin], [], [], 0)
-        return bool(dr)
-
-# ────────── 상수 및 유틸 ──────────
-EMPTY, SEMICOLON = ' ', ';'
-
-
-def clear_screen():
-    # 화면 전체 지우고 커서 좌상단으로
-    print("\033[0;0H", end='')
-
-# game.py
-
-
-
-
+# ────────── 상수 ──────────
 DIR = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
 
+FRAME_RATE = 30          # 초당 최대 렌더링 횟수
+KEY_POLL_INTERVAL = 0.1  # 키 입력 대기 시간(초). 종료 요청을 이 간격으로 확인
+
 class Game:
-    def __init__(self, map:Map):
-        self.mapmanager = MapManager(map)
+    def __init__(self, map:Map, keys:Optional[KeyReader]=None, journal:Optional[SessionJournal]=None):
+        # 렌더링은 Game의 렌더 작업이 맡으므로 MapManager는 프레임만 남김
+        self.mapmanager = MapManager(map, auto_render=False)
+        # 메뉴에서 넘겨받은 입력기를 그대로 사용 (터미널 모드 전환을 한 번만 하기 위함)
+        self.keys = keys if keys is not None else KeyReader()
+        # 세션 기록: 비정상 종료 후 다시 시작하면 이어서 진행
+        self.journal = journal
 
 
 
@@ -57,24 +29,108 @@ class Game:
             os.system('cls')
         if not self.mapmanager.initialize():
             return True
-            
+        self._start_journal()
+
         self.mapmanager.render()
+        with self.keys:
+            result = asyncio.run(self._run())
+        # 클리어 / Q로 정상 종료하면 기록은 필요 없음 (예외로 끝나면 남겨 두어 다음에 이어서 진행)
+        if self.journal is not None:
+            self.journal.discard()
+        return result
+
+    def _start_journal(self):
+        """세션 기록을 열고, 이전에 끝나지 않은 기록이 있으면 그 상태에서 이어서 시작합니다."""
+        if self.journal is None:
+            return
+        try:
+            states = self.journal.start(self.mapmanager.maplogic)
+        except OSError:
+            # 기록을 쓸 수 없어도 게임은 진행
+            return
+        if states:
+            self.mapmanager.resume(states)
+        self.mapmanager.journal = self.journal
+
+    async def _run(self) -> bool:
+        """
+        키 입력, 이동 처리, 렌더링을 각각의 작업으로 돌립니다.
+        - 키 입력: 전용 스레드에서 대기하며 큐에 넣음
+        - 이동 처리: 큐에서 하나씩 꺼내 전용 스레드에서 순서대로 실행 (4방향 예측은 MapManager가 백그라운드로 수행)
+        - 렌더링: FRAME_RATE 간격으로 가장 최근 프레임만 그림
+        클리어하면 True, Q로 나가면 False를 반환합니다.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = asyncio.Event()
+        input_pool = ThreadPoolExecutor(max_workers=1)
+        move_pool = ThreadPoolExecutor(max_workers=1)
+        render_pool = ThreadPoolExecutor(max_workers=1)
+        reader = asyncio.create_task(self._read_keys(queue, stop, input_pool))
+        renderer = asyncio.create_task(self._render_frames(stop, render_pool))
+        mover = asyncio.create_task(self._apply_moves(queue, move_pool))
+        try:
+            # 키 입력/렌더링 작업은 stop 전에는 끝나지 않으므로, 먼저 끝났다면 예외로 멈춘 것
+            # (예: 입력이 닫혀 EOFError) → 이동 처리를 기다리지 않고 그 예외를 다시 발생
+            done, _ = await asyncio.wait({reader, renderer, mover}, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not mover:
+                    task.result()
+            return mover.result()
+        finally:
+            stop.set()
+            mover.cancel()
+            await asyncio.gather(reader, renderer, mover, return_exceptions=True)
+            # 마지막 상태(클리어 화면 등)가 남아 있으면 그리고 끝냄
+            self._draw_pending()
+            for pool in (input_pool, move_pool, render_pool):
+                pool.shutdown(wait=True)
+
+    async def _read_keys(self, queue: asyncio.Queue, stop: asyncio.Event, pool: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            ch = await loop.run_in_executor(pool, self.keys.read_key, KEY_POLL_INTERVAL)
+            if ch is not None:
+                queue.put_nowait(ch)
+
+    async def _apply_moves(self, queue: asyncio.Queue, pool: ThreadPoolExecutor) -> bool:
+        loop = asyncio.get_running_loop()
         while True:
-            if key_pressed():
-                ch = get_key()
-                if ch.lower() == 'q':# QUIT
-                    return False
-                if ch.lower() == 'z':  # UNDO
-                    self.mapmanager.undo()
-                    continue
-                if ch.lower() == 'x':  # REDO
-                    self.mapmanager.redo()
-                    continue
-                if ch in DIR:
-                    dx, dy = DIR[ch]
-                    result=self.mapmanager.move_and_execute(dx, dy)
-                        # 실패하는 경우는 아직은 무한루프뿐임
-                    if not result:
-                        return True
+            ch = await queue.get()
+            if ch.lower() == 'q':# QUIT
+                # 메뉴로 돌아간 뒤에도 공용 풀에서 예측이 돌지 않도록 취소
+                self.mapmanager._clear_future()
+                return False
+            if ch.lower() == 'z':  # UNDO
+                await loop.run_in_executor(pool, self.mapmanager.undo)
+                continue
+            if ch.lower() == 'x':  # REDO
+                await loop.run_in_executor(pool, self.mapmanager.redo)
+                continue
+            if ch.lower() == 's':  # 통계 표시 전환
+                STATS.toggle()
+                self.mapmanager.refresh()
+                continue
+            if ch in DIR:
+                dx, dy = DIR[ch]
+                result = await loop.run_in_executor(pool, self.mapmanager.move_and_execute, dx, dy)
+                    # 실패하는 경우는 아직은 무한루프뿐임
+                if not result:
+                    self.mapmanager._clear_future()
+                    return True
 
+    async def _render_frames(self, stop: asyncio.Event, pool: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        interval = 1 / FRAME_RATE
+        while not stop.is_set():
+            started = loop.time()
+            # 그리는 동안 쌓인 프레임은 가장 최근 것만 남으므로 건너뛴 셈이 됨
+            await loop.run_in_executor(pool, self._draw_pending)
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, interval - (loop.time() - started)))
+            except asyncio.TimeoutError:
+                pass
 
+    def _draw_pending(self):
+        frame = self.mapmanager.take_frame()
+        if frame is not None:
+            self.mapmanager.draw(*frame)
@@ -0,0 +1,150 @@
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from history import History
+from map_module import Map, MoveCache
+
+'''
+터미널 없이 맵을 실행하는 도구
+
+mapdata.json에서 맵을 불러와 이동 스크립트(예: UUDDLR)를 적용하고,
+최종 보드 / 결과 / 단계별 소요 시간을 JSON 한 줄로 출력한다.
+화면 출력과 글자 분류(하이라이트)는 하지 않는다.
+
+스크립트 문자
+    U D L R : 위 / 아래 / 왼쪽 / 오른쪽 이동
+    Z X     : UNDO / REDO
+    그 외 문자(공백 등)는 무시
+
+사용 예
+    python headless.py "맵 이름" UUDDLR RRZX
+    python headless.py 3 --scripts moves.txt --no-cache
+'''
+
+MOVES = {'U': (0, -1), 'D': (0, 1), 'L': (-1, 0), 'R': (1, 0)}
+UNDO, REDO = 'Z', 'X'
+
+
+def load_maps(mapdata_file: str = "mapdata.json") -> Dict[str, Dict[str, Any]]:
+    """mapdata.json의 맵들을 이름 → 항목 dict로 불러옵니다. (순서 유지)"""
+    with open(mapdata_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {m['name']: m for m in data.get('maps', []) if m.get('name')}
+
+
+def find_map(maps: Dict[str, Dict[str, Any]], key: str) -> Dict[str, Any]:
+    """이름 또는 0부터 시작하는 번호로 맵을 찾습니다."""
+    if key in maps:
+        return maps[key]
+    if key.isdigit() and int(key) < len(maps):
+        return list(maps.values())[int(key)]
+    raise KeyError(f"맵을 찾을 수 없습니다: {key}")
+
+
+def make_map(entry: Dict[str, Any], highlight: bool = False) -> Map:
+    return Map(entry['name'], entry.get('data', []), entry.get('returnValue'),
+               entry.get('stepLimit'), highlight=highlight)
+
+
+def run_script(entry: Dict[str, Any], script: str, cache: Optional[MoveCache] = None,
+               highlight: bool = False) -> Dict[str, Any]:
+    """
+    맵 하나에 스크립트를 적용하고 결과를 dict로 반환합니다.
+    cache를 넘기면 여러 스크립트가 같은 이동 캐시를 공유합니다.
+    이동/UNDO/REDO 처리는 MapManager와 같습니다. (무한루프면 이동 전 상태로 되돌림)
+    """
+    started = time.perf_counter()
+    map = make_map(entry, highlight)
+    if cache is not None:
+        map.move_cache = cache
+    # 시작하자마자 무한루프인 맵은 스크립트를 실행하지 않고 오류만 보고 (다른 스크립트/맵은 계속)
+    init_error: Optional[str] = None
+    try:
+        cleared = map.initialize() is False
+    except RecursionError as e:
+        cleared, init_error = False, str(e)
+    history = History(map.board, map.board_inf)
+    init_ms = (time.perf_counter() - started) * 1000
+
+    steps: List[Dict[str, Any]] = []
+    for key in script.upper():
+        if cleared or init_error is not None:
+            break
+        if key not in MOVES and key not in (UNDO, REDO):
+            continue
+        step: Dict[str, Any] = {'key': key}
+        t0 = time.perf_counter()
+        if key == UNDO or key == REDO:
+            state = history.undo() if key == UNDO else history.redo()
+            if state is not None:
+                map.restore(*state)
+        else:
+            dx, dy = MOVES[key]
+            try:
+                cleared = map.move_and_execute(dx, dy) is False
+                history.record(map.board, map.board_inf)
+            except RecursionError as e:
+                map.restore(*history.current())
+                step['error'] = str(e)
+        step['ms'] = round((time.perf_counter() - t0) * 1000, 4)
+        steps.append(step)
+
+    report = {
+        'map': entry['name'],
+        'script': script,
+        'cleared': cleared,
+        'init_ms': round(init_ms, 4),
+        'total_ms': round((time.perf_counter() - started) * 1000, 4),
+        'steps': steps,
+        'board': list(map.board),
+    }
+    if init_error is not None:
+        report['error'] = init_error
+    return report
+
+
+def run_scripts(entry: Dict[str, Any], scripts: Iterable[str], use_cache: bool = True,
+                highlight: bool = False) -> Iterable[Dict[str, Any]]:
+    """여러 스크립트를 차례로 실행합니다. use_cache면 이동 캐시를 스크립트끼리 공유합니다."""
+    cache = MoveCache() if use_cache else MoveCache(maxsize=0)
+    for script in scripts:
+        yield run_script(entry, script, cache, highlight)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="터미널 없이 맵에 이동 스크립트를 적용합니다.")
+    parser.add_argument('map', help="맵 이름 또는 번호(0부터)")
+    parser.add_argument('scripts', nargs='*', help="이동 스크립트 (U/D/L/R, Z=UNDO, X=REDO)")
+    parser.add_argument('--scripts', dest='script_file', help="한 줄에 스크립트 하나씩 적힌 파일 ('-'는 표준 입력)")
+    parser.add_argument('--mapdata', default="mapdata.json", help="맵 데이터 파일 (기본: mapdata.json)")
+    parser.add_argument('--no-cache', action='store_true', help="이동 캐시를 쓰지 않음 (인터프리터 처리량 측정용)")
+    parser.add_argument('--highlight', action='store_true', help="글자 분류(board_inf)도 계산")
+    parser.add_argument('--no-board', action='store_true', help="결과에서 최종 보드를 생략")
+    args = parser.parse_args(argv)
+
+    try:
+        entry = find_map(load_maps(args.mapdata), args.map)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"맵 로드 실패: {e}", file=sys.stderr)
+        return 1
+
+    scripts = list(args.scripts)
+    if args.script_file:
+        f = sys.stdin if args.script_file == '-' else open(args.script_file, 'r', encoding='utf-8')
+        with f:
+            scripts.extend(line.strip() for line in f if line.strip())
+    if not scripts:
+        scripts = ['']
+
+    for report in run_scripts(entry, scripts, not args.no_cache, args.highlight):
+        if args.no_board:
+            del report['board']
+        print(json.dumps(report, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
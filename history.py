@@ -0,0 +1,164 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from inf import Inf
+
+Rows = Tuple[str, ...]
+InfRows = Tuple[Tuple[Inf, ...], ...]
+
+# 줄 하나를 저장할 때 문자열 본문 외에 드는 대략적인 비용(바이트)
+_ROW_OVERHEAD = 64
+
+DEFAULT_CHECKPOINT_INTERVAL = 32
+DEFAULT_MEMORY_BUDGET = 16 * 1024 * 1024
+
+
+class _Checkpoint(NamedTuple):
+    """보드 전체 상태"""
+    rows: Rows
+    inf: InfRows
+    size: int
+
+
+class _Delta(NamedTuple):
+    """직전 상태에서 바뀐 줄만 저장: y → (줄, 줄의 board_inf)"""
+    changes: Dict[int, Tuple[str, Tuple[Inf, ...]]]
+    size: int
+
+
+class History:
+    """
+    UNDO/REDO용 상태 타임라인.
+    - 이동마다 바뀐 줄만 담은 변경 묶음(_Delta)을 저장하고,
+      checkpoint_interval개마다 보드 전체(_Checkpoint)를 저장한다.
+    - board_inf도 함께 저장하므로 되돌릴 때 다시 분류할 필요가 없다.
+    - 저장량이 memory_budget(바이트)을 넘으면 가장 오래된 구간부터 버린다.
+    """
+
+    def __init__(self, board: Iterable[str], board_inf: Sequence[Tuple[Inf, ...]],
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.checkpoint_interval = checkpoint_interval
+        self.memory_budget = memory_budget
+        self.reset(board, board_inf)
+
+    def reset(self, board: Iterable[str], board_inf: Sequence[Tuple[Inf, ...]]) -> None:
+        """히스토리를 비우고 현재 상태 하나만 남깁니다."""
+        rows, inf = tuple(board), tuple(board_inf)
+        first = self._checkpoint(rows, inf)
+        self._entries: List = [first]
+        self._pos = 0                 # 현재 상태의 인덱스
+        self._size = first.size
+        self._rows, self._inf = rows, inf   # 현재 상태
+
+    @property
+    def size(self) -> int:
+        """저장 중인 상태의 대략적인 크기(바이트)"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def current(self) -> Tuple[Rows, InfRows]:
+        """현재 상태의 (줄 목록, board_inf)를 반환합니다."""
+        return self._rows, self._inf
+
+    def record(self, board: Iterable[str], board_inf: Sequence[Tuple[Inf, ...]]) -> bool:
+        """
+        새 상태를 현재 상태 뒤에 기록하고 REDO 구간을 버립니다.
+        현재 상태와 같으면 기록하지 않고 False를 반환합니다.
+        """
+        rows, inf = tuple(board), tuple(board_inf)
+        prev = self._rows
+        if len(rows) != len(prev):
+            changes = None
+        else:
+            changes = {
+                y: (row, inf[y])
+                for y, row in enumerate(rows)
+                if row is not prev[y] and row != prev[y]
+            }
+            if not changes:
+                return False
+
+        # REDO 구간 버리기
+        for entry in self._entries[self._pos + 1:]:
+            self._size -= entry.size
+        del self._entries[self._pos + 1:]
+
+        # 마지막 체크포인트 이후 변경 묶음이 checkpoint_interval개 쌓이면 전체 저장
+        since_checkpoint = self._pos - self._last_checkpoint(self._pos)
+        if changes is None or since_checkpoint + 1 >= self.checkpoint_interval:
+            entry = self._checkpoint(rows, inf)
+        else:
+            size = sum(len(row) + _ROW_OVERHEAD for row, _ in changes.values())
+            entry = _Delta(changes, size)
+        self._entries.append(entry)
+        self._size += entry.size
+        self._pos += 1
+        self._rows, self._inf = rows, inf
+        self._evict()
+        return True
+
+    def undo(self) -> Optional[Tuple[Rows, InfRows]]:
+        """한 단계 이전 상태로 이동하여 (줄 목록, board_inf)를 반환합니다. 없으면 None."""
+        if self._pos == 0:
+            return None
+        self._pos -= 1
+        self._rows, self._inf = self._materialize(self._pos)
+        return self._rows, self._inf
+
+    def redo(self) -> Optional[Tuple[Rows, InfRows]]:
+        """UNDO한 상태를 다시 앞으로 이동하여 (줄 목록, board_inf)를 반환합니다. 없으면 None."""
+        if self._pos + 1 >= len(self._entries):
+            return None
+        self._pos += 1
+        self._rows, self._inf = self._apply(self._entries[self._pos], self._rows, self._inf)
+        return self._rows, self._inf
+
+    # ───── 내부 구현 ─────
+    def _checkpoint(self, rows: Rows, inf: InfRows) -> _Checkpoint:
+        size = sum(len(row) + _ROW_OVERHEAD for row in rows)
+        return _Checkpoint(rows, inf, size)
+
+    def _last_checkpoint(self, index: int) -> int:
+        """index 이하에서 가장 가까운 체크포인트의 인덱스"""
+        while not isinstance(self._entries[index], _Checkpoint):
+            index -= 1
+        return index
+
+    @staticmethod
+    def _apply(entry, rows: Rows, inf: InfRows) -> Tuple[Rows, InfRows]:
+        if isinstance(entry, _Checkpoint):
+            return entry.rows, entry.inf
+        new_rows, new_inf = list(rows), list(inf)
+        for y, (row, row_inf) in entry.changes.items():
+            new_rows[y] = row
+            new_inf[y] = row_inf
+        return tuple(new_rows), tuple(new_inf)
+
+    def _materialize(self, index: int) -> Tuple[Rows, InfRows]:
+        """가장 가까운 체크포인트에서 index까지 변경 묶음을 적용해 상태를 만듭니다."""
+        start = self._last_checkpoint(index)
+        rows, inf = self._entries[start].rows, self._entries[start].inf
+        if start == index:
+            return rows, inf
+        new_rows, new_inf = list(rows), list(inf)
+        for entry in self._entries[start + 1:index + 1]:
+            for y, (row, row_inf) in entry.changes.items():
+                new_rows[y] = row
+                new_inf[y] = row_inf
+        return tuple(new_rows), tuple(new_inf)
+
+    def _evict(self) -> None:
+        """예산을 넘으면 현재 상태보다 앞선 가장 오래된 체크포인트 구간을 버립니다."""
+        while self._size > self.memory_budget:
+            # 맨 앞 다음의 체크포인트를 찾아 그 앞까지 버림
+            cut = next(
+                (i for i in range(1, self._pos + 1) if isinstance(self._entries[i], _Checkpoint)),
+                None
+            )
+            if cut is None:
+                break
+            for entry in self._entries[:cut]:
+                self._size -= entry.size
+            del self._entries[:cut]
+            self._pos -= cut
@@ -1,13 +1,61 @@
 from command_parser import parse_and_execute_command
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional, Tuple
 if TYPE_CHECKING:
+    import threading
     from map_module import Map
 from variablemap import VariableMap
 from inf import Inf
+from stats import STATS
+from functools import lru_cache
 import re
 
 
-EMPTY, SEMICOLON = ' ', ';'
+# interpret 한 번에 허용되는 while 반복 횟수 기본값 (맵의 stepLimit으로 변경 가능)
+DEFAULT_STEP_LIMIT = 10000
+
+
+_STATEMENT_PATTERN = re.compile(r"[^ ;#]+;")
+
+
+def row_statements(map: 'Map', y: int) -> List[Tuple[int, str]]:
+    """
+    y번째 줄의 (세미콜론 x좌표, 코드) 목록을 반환합니다.
+    결과는 map.statement_index에 줄 버전과 함께 저장되며,
+    줄이 바뀌지 않았다면 다시 계산하지 않습니다.
+    """
+    version = map.row_versions[y]
+    cached = map.statement_index[y]
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    row = map.board[y]
+    statements = [(m.end() - 1, m.group()[:-1]) for m in _STATEMENT_PATTERN.finditer(row)]
+    map.statement_index[y] = (version, statements)
+    return statements
+
+
+class Cancelled(Exception):
+    """미리 계산 중이던 interpret가 취소됨"""
+
+
+class StepBudget:
+    """
+    interpret 한 번 동안 허용되는 while 반복 횟수.
+    모두 쓰면 RecursionError를 발생시켜 무한루프를 끊는다.
+    cancel_event가 설정되면 다음 확인 시점에 Cancelled를 발생시킨다.
+    """
+    def __init__(self, limit: int, cancel_event: Optional['threading.Event'] = None):
+        self.remaining = limit
+        self.cancel_event = cancel_event
+
+    def check(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise Cancelled()
+
+    def spend(self) -> None:
+        self.remaining -= 1
+        if self.remaining < 0:
+            raise RecursionError("무한루프 발생!!")
+        self.check()
 
 
 def interpretline(
@@ -15,157 +63,163 @@ def interpretline(
     pc: int,
     variable_map: VariableMap,
     start_x: int = 0,
-    recursionlimit=100
+    budget: Optional[StepBudget] = None
 ) -> bool:
     """
     한 줄(pc)에서 start_x 위치부터 오른쪽으로 ';' 명령어 해석.
-    if: False 시 해당 줄 남은 명령 스킵 (True 리턴)
-    while: 조건이 True인 동안 start_x=x+1 위치부터 재귀적으로 실행
+    if: False 시 현재 실행 구간의 남은 명령 스킵
+    while: 조건이 True이면 x+1 위치부터 줄 끝까지 실행한 뒤 while 위치로 돌아감
+    실행 중인 while은 재귀 대신 loop_heads 스택으로 관리하며, 반복마다 budget을 소모한다.
     """
-    if recursionlimit<0:
-        raise RecursionError("무한루프 발생!!")
-    for x in range(start_x, map.W):
-        if map.board[pc][x] != SEMICOLON:
-            continue
-
-        # --- 코드 추출 ---
-        code = ''
-        tx = x - 1
-        while tx >= 0 and map.board[pc][tx] not in (EMPTY, SEMICOLON,'#'):
-            code = map.board[pc][tx] + code
-            tx -= 1
-
-        # --- if 처리 ---
-        if code.startswith('if(') and code.endswith(')'):
-            cond = code[3:-1].strip()
-            try:
-                condition=variable_map.get_value(cond)
-            except:
-                continue
-            if not condition:
-                # 이 줄 나머지 건너뛰고 성공 리턴
-                return True
-        # --- while 처리 (재귀 호출 사용) ---
-        elif code.startswith('while(') and code.endswith(')'):
-            cond = code[6:-1].strip()
-            # 조건이 True인 동안, 줄의 나머지(start_x=x+1부터) 재귀 실행
-            try:
-                condition = variable_map.get_value(cond)
-            except:
-                continue
-            if condition:
-                if not interpretline(map, pc, variable_map, start_x=x+1,recursionlimit=recursionlimit-1):
+    if budget is None:
+        budget = StepBudget(map.step_limit, map.cancel_event)
+    loop_heads: List[int] = []   # 실행 중인 while 코드의 시작 x (안쪽 while이 뒤)
+    version = None
+    last_x = start_x - 1
+    while True:
+        # 명령 실행으로 줄이 바뀌었으면 문장 목록을 다시 가져옴
+        if version != map.row_versions[pc]:
+            version = map.row_versions[pc]
+            statements = row_statements(map, pc)
+            i = 0
+            while i < len(statements) and statements[i][0] <= last_x:
+                i += 1
+
+        end_of_block = i >= len(statements)
+        if not end_of_block:
+            x, code = statements[i]
+            i += 1
+            last_x = x
+
+            # --- if 처리 ---
+            if code.startswith('if(') and code.endswith(')'):
+                cond = code[3:-1].strip()
+                try:
+                    condition=variable_map.get_value(cond)
+                except:
+                    continue
+                # False면 이 구간의 나머지를 건너뜀
+                end_of_block = not condition
+            # --- while 처리 ---
+            elif code.startswith('while(') and code.endswith(')'):
+                cond = code[6:-1].strip()
+                try:
+                    condition = variable_map.get_value(cond)
+                except:
+                    continue
+                if condition:
+                    # 본문(x+1부터 줄 끝)을 실행한 뒤 while 위치로 돌아옴
+                    budget.spend()
+                    loop_heads.append(x - len(code))
+                else:
+                    # while 끝나면 더 이상 이 구간의 뒤쪽 명령 안 실행
+                    end_of_block = True
+
+            # --- 일반 명령 실행 ---
+            else:
+                try:
+                    GameOver = parse_and_execute_command(
+                        map,
+                        variable_map,
+                        code,
+                        pos=(x, pc)
+                    )
+                except SyntaxError as e:
+                    continue
+                except NameError as e:
+                    continue
+
+                if not GameOver:
                     return False
-                if not interpretline(map, pc, variable_map, x-len(code),recursionlimit=recursionlimit-1):
-                    return False
-                # while 끝나면 더 이상 이 줄의 뒤쪽 명령 안 실행
-            return True
-
-        # --- 일반 명령 실행 ---
-        else:
-            try:
-                GameOver = parse_and_execute_command(
-                    map,
-                    variable_map,
-                    code,
-                    pos=(x, pc)
-                )
-            except SyntaxError as e:
-                continue
-            except NameError as e:
-                continue
-           
-            if not GameOver:
-                return False
 
-    # 한 줄 끝까지 정상 실행
-    return True
+        if end_of_block:
+            if not loop_heads:
+                # 한 줄 끝까지 정상 실행
+                return True
+            # 감싸고 있는 while의 조건부터 다시 실행
+            last_x = loop_heads.pop() - 1
+            version = None
 
 
 def interpret(map: 'Map') -> bool:
     """
     전체 보드를 위에서 아래로 순회하며 interpretline(start_x=0) 실행
+    문장 목록은 줄 단위로 캐시되므로 바뀐 줄만 다시 분석한다.
+    while 반복 횟수는 보드 전체에서 map.step_limit회로 제한된다.
+    map.cancel_event가 설정되면 Cancelled를 발생시키고 중단한다.
     """
     vm = VariableMap()
-    for pc in range(map.H):
-        if not interpretline(map, pc, vm):
-            return False
-        
+    budget = StepBudget(map.step_limit, map.cancel_event)
+    try:
+        for pc in range(map.H):
+            # 실행할 문장이 없는 줄은 건너뜀
+            if not row_statements(map, pc):
+                continue
+            budget.check()
+            if not interpretline(map, pc, vm, budget=budget):
+                return False
+    finally:
+        STATS.count('while 반복', min(map.step_limit, map.step_limit - budget.remaining), map.stats_buffer)
 
     return True
 
 
-def get_board_inf(map: "Map"):
-    def slow_fib(n: int) -> int:
-        if n <= 1:
-            return n
-        return slow_fib(n - 1) + slow_fib(n - 2)
-    #slow_fib(30)
-    # 토큰 정의
-    FUNC     = {"print","drop","swap","delete","scramble","teleport","explode","inverse","lift","switch"}
-    CONTROL  = {"if","while","return","return_"}
-    SEMI_CH  = {";"}
-    BOX_CH   = {"#"}
-    OP_CH    = {"=", "+", "-", "*", "/", "%", "|", "&", "!", "(", ")"}
-    QUOTE    = {"\"","\'"}
-
-    # 결과 배열 초기화
-    board_inf = [
-        [Inf.NONE for _ in range(map.W)]
-        for _ in range(map.H)
-    ]
-
-    # 0) 문자열 리터럴 스캔: "여기안에공백없음"
-    string_pattern = re.compile(r'("([^"\s;#]+)")|(\'([^\'\s;#]+)\')')
-    for i in range(map.H):
-        row = "".join(map.board[i])
-        for m in string_pattern.finditer(row):
-            start, end = m.start(), m.end()
-            for k in range(start, end):
-                board_inf[i][k] = Inf.STRING
-
-    # 1) 다글자 토큰 스캔 (문자열 리터럴 건너뛰기)
-    scan_list = [
-        (FUNC,    Inf.FUNC),
-        (CONTROL, Inf.CONTROL),
-        
-    ]
-    for i in range(map.H):
-        row = "".join(map.board[i])
-        for token_set, inf_type in scan_list:
-            for token in token_set:
-                start = 0
-                while True:
-                    idx = row.find(token, start)
-                    if idx == -1:
-                        break
-                    # 문자열 리터럴 안에 겹치지 않도록 체크
-                    if board_inf[i][idx] == Inf.STRING:
-                        start = idx + 1
-                        continue
-                    # 발견된 모든 문자 위치에 inf_type 기록
-                    for k in range(len(token)):
-                        # 기존 STRING 태그 덮어쓰지 않도록
-                        if board_inf[i][idx + k] == Inf.NONE:
-                            board_inf[i][idx + k] = inf_type
-                    start = idx + 1
+# ───── 구문 강조용 토큰 정의 ─────
+FUNC     = ("print","drop","swap","delete","scramble","teleport","explode","inverse","lift","switch")
+CONTROL  = ("if","while","return","return_")
+OP_CH    = "=+-*/%|&!()"
+
+_TOKEN_INF = {**{token: Inf.FUNC for token in FUNC}, **{token: Inf.CONTROL for token in CONTROL}}
+# 모든 위치에서 시작하는 토큰을 한 번에 찾음 (겹치는 경우 포함, 긴 토큰 우선)
+_TOKEN_PATTERN = re.compile(
+    "(?=(" + "|".join(sorted(_TOKEN_INF, key=len, reverse=True)) + "))"
+)
+# 문자열 리터럴: "여기안에공백없음"
+_STRING_PATTERN = re.compile(r'("([^"\s;#]+)")|(\'([^\'\s;#]+)\')')
+# 남은 한 글자 칸 분류
+_CHAR_INF = {
+    ";": Inf.SEMICOLON,
+    "#": Inf.BOX,
+    "\"": Inf.STRING,
+    "\'": Inf.STRING,
+    **{ch: Inf.OP for ch in OP_CH},
+}
+
+
+@lru_cache(maxsize=4096)
+def classify_row(row: str) -> Tuple[Inf, ...]:
+    """
+    한 줄을 한 번 훑어 칸마다 Inf를 매긴다. 결과는 줄 내용별로 캐시된다.
+    우선순위: 문자열 리터럴 > FUNC > CONTROL > 한 글자 분류
+    """
+    inf = [Inf.NONE] * len(row)
+
+    # 0) 문자열 리터럴
+    for m in _STRING_PATTERN.finditer(row):
+        start, end = m.start(), m.end()
+        inf[start:end] = [Inf.STRING] * (end - start)
+
+    # 1) 다글자 토큰 (문자열 리터럴 안에서 시작하는 것은 건너뜀)
+    for m in _TOKEN_PATTERN.finditer(row):
+        start = m.start()
+        if inf[start] is Inf.STRING:
+            continue
+        token = m.group(1)
+        inf_type = _TOKEN_INF[token]
+        for k in range(start, start + len(token)):
+            # STRING은 덮어쓰지 않고, FUNC는 CONTROL보다 우선
+            cur = inf[k]
+            if cur is Inf.NONE or (cur is Inf.CONTROL and inf_type is Inf.FUNC):
+                inf[k] = inf_type
 
     # 2) 남은 한 글자 칸 분류
-    for i in range(map.H):
-        for j in range(map.W):
-            if board_inf[i][j] != Inf.NONE:
-                continue  # 이미 태그된 칸 건너뜀
-            c = map.board[i][j]
-            if c in SEMI_CH:
-                board_inf[i][j] = Inf.SEMICOLON
-            elif c in OP_CH:
-                board_inf[i][j] = Inf.OP
-            elif c in BOX_CH:
-                board_inf[i][j] = Inf.BOX
-            elif c in QUOTE:
-                board_inf[i][j] = Inf.STRING
-            # else: Inf.NONE 유지
-
-    return board_inf
+    for j, ch in enumerate(row):
+        if inf[j] is Inf.NONE:
+            inf[j] = _CHAR_INF.get(ch, Inf.NONE)
+
+    return tuple(inf)
 
 
+def get_board_inf(map: "Map") -> List[Tuple[Inf, ...]]:
+    """보드 전체의 board_inf를 줄 단위로 계산한다."""
+    return [classify_row(row) for row in map.board]
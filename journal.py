@@ -0,0 +1,299 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from map_module import Map
+
+'''
+세션 기록 (크래시 복구 / 특정 시점으로 이동)
+
+게임 중 이동 / UNDO / REDO를 맵마다 하나의 파일(.journal/<맵 이름 해시>.jsonl)에
+한 줄씩 덧붙여 기록한다. 기존 내용은 고치지 않으므로 도중에 프로세스가 죽어도
+마지막 한 줄만 깨질 수 있고, 읽을 때 그 줄은 버린다.
+
+레코드 (JSON 한 줄씩)
+    {"t": "start", "version", "map", "returnValue", "stepLimit", "rows"}   첫 줄. initialize 후 보드
+    {"t": "move", "d": [dx, dy], "h": crc}     이동으로 새 상태가 생김 (h: 이동 후 보드의 crc32)
+    {"t": "checkpoint", "rows": [...]}         바로 앞 이동으로 생긴 상태의 보드 전체
+    {"t": "undo"} / {"t": "redo"}
+    {"t": "resume"}                            크래시 후 이어서 시작 (REDO 구간은 이어지지 않음)
+
+상태는 이동마다 하나씩 생기며 부모 상태와 방향만 기억한다.
+이동 결과는 보드와 방향만으로 정해지므로, 가장 가까운 체크포인트 조상에서 이동을 다시 실행하면
+어느 상태의 보드든 만들 수 있다. 체크포인트는 조상 체크포인트에서 checkpoint_interval번 떨어진
+상태마다 저장하므로 다시 실행하는 이동은 최대 checkpoint_interval번이다.
+UNDO는 부모 상태로, REDO는 UNDO로 떠났던 자식 상태로 이동하며 MapManager의 History와 같이 움직인다.
+
+줄마다 flush하고 체크포인트를 쓸 때 fsync한다.
+
+사용 예
+    python journal.py .journal/<파일>.jsonl              # 요약
+    python journal.py .journal/<파일>.jsonl --seek 120   # 120번째 기록 직후의 보드
+'''
+
+JOURNAL_VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL = 32
+
+Rows = Tuple[str, ...]
+
+
+def board_crc(rows) -> int:
+    return zlib.crc32('\n'.join(rows).encode('utf-8'))
+
+
+class SessionJournal:
+    def __init__(self, path: str, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self._file = None
+        self._clear()
+
+    @staticmethod
+    def path_beside(mapdata_file: str, name: str) -> str:
+        """mapdata_file과 같은 폴더의 .journal 안에서 name 맵의 기록 파일 경로"""
+        key = hashlib.sha256(name.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(os.path.dirname(os.path.abspath(mapdata_file)), ".journal", key + ".jsonl")
+
+    def _clear(self) -> None:
+        self.header: Optional[Dict[str, Any]] = None
+        # 상태 번호 → 부모 상태, 부모에서 온 방향, 이동 후 보드 crc, 체크포인트 이후 이동 수
+        self._parents: List[int] = [-1]
+        self._moves: List[Optional[Tuple[int, int]]] = [None]
+        self._crcs: List[Optional[int]] = [None]
+        self._since_checkpoint: List[int] = [0]
+        self._checkpoints: Dict[int, Rows] = {}
+        self._current = 0
+        self._redo: List[int] = []
+        # 기록(이동/UNDO/REDO)마다 그 직후의 상태 번호
+        self._actions: List[int] = []
+        self._valid_size = 0
+        self._torn = False
+
+    def __len__(self) -> int:
+        """이동 / UNDO / REDO 기록 수"""
+        return len(self._actions)
+
+    @property
+    def current(self) -> int:
+        """현재 상태 번호 (0: 시작 상태)"""
+        return self._current
+
+    # ───── 읽기 ─────
+    def load(self) -> bool:
+        """
+        파일을 읽어 상태 목록을 다시 만듭니다. 기록이 없으면 False.
+        마지막 줄이 깨져 있으면(쓰는 도중 종료) 그 줄은 버립니다. 파일은 고치지 않으며,
+        깨진 부분은 start()에서 이어 쓰기 전에 잘라 냅니다.
+        형식이 맞지 않으면 ValueError.
+        """
+        self._clear()
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        good = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            self._apply(record)
+            good += len(line)
+        if self.header is None:
+            return False
+        # 온전한 레코드들의 길이. 이보다 길면 끝에 깨진 줄이 있음
+        self._valid_size = good
+        self._torn = good < len(data)
+        return True
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """레코드 하나를 상태 목록에 반영합니다."""
+        kind = record.get('t')
+        if self.header is None:
+            if kind != 'start' or record.get('version') != JOURNAL_VERSION:
+                raise ValueError("세션 기록의 첫 줄이 아닙니다")
+            self.header = record
+            self._checkpoints[0] = tuple(record['rows'])
+            return
+        if kind == 'move':
+            dx, dy = record['d']
+            self._new_state((dx, dy), record['h'])
+        elif kind == 'checkpoint':
+            state = len(self._parents) - 1
+            self._checkpoints[state] = tuple(record['rows'])
+            self._since_checkpoint[state] = 0
+            return
+        elif kind == 'undo':
+            if self._current == 0:
+                raise ValueError("시작 상태에서 UNDO")
+            self._redo.append(self._current)
+            self._current = self._parents[self._current]
+        elif kind == 'redo':
+            if not self._redo:
+                raise ValueError("REDO할 상태가 없음")
+            self._current = self._redo.pop()
+        elif kind == 'resume':
+            self._redo = []
+            return
+        else:
+            raise ValueError(f"알 수 없는 레코드: {kind}")
+        self._actions.append(self._current)
+
+    def _new_state(self, direction: Tuple[int, int], crc: int) -> int:
+        parent = self._current
+        self._parents.append(parent)
+        self._moves.append(direction)
+        self._crcs.append(crc)
+        self._since_checkpoint.append(self._since_checkpoint[parent] + 1)
+        self._current = len(self._parents) - 1
+        self._redo = []
+        return self._current
+
+    def _replay_map(self, rows: Rows) -> Map:
+        h = self.header
+        return Map(h['map'], list(rows), h.get('returnValue'), h.get('stepLimit'), highlight=False)
+
+    def states_to(self, state: int) -> List[Rows]:
+        """
+        가장 가까운 체크포인트 조상부터 state까지의 보드 목록 (마지막이 state의 보드).
+        체크포인트에서 이동을 다시 실행하며, 결과가 기록된 crc와 다르면 ValueError.
+        """
+        chain: List[int] = []
+        while state not in self._checkpoints:
+            chain.append(state)
+            state = self._parents[state]
+        path = [self._checkpoints[state]]
+        if chain:
+            map = self._replay_map(path[0])
+            for state in reversed(chain):
+                map.move_and_execute(*self._moves[state])
+                rows = tuple(map.board)
+                if board_crc(rows) != self._crcs[state]:
+                    raise ValueError("다시 실행한 결과가 기록과 다릅니다 (맵이나 규칙이 바뀜)")
+                path.append(rows)
+        return path
+
+    def seek(self, index: int) -> Rows:
+        """index번째 기록 직후의 보드 (0이면 시작 상태)"""
+        if not 0 <= index <= len(self._actions):
+            raise IndexError(f"기록 범위 밖: {index} (0~{len(self._actions)})")
+        state = self._actions[index - 1] if index else 0
+        return self.states_to(state)[-1]
+
+    # ───── 쓰기 ─────
+    def start(self, map: Map) -> List[Rows]:
+        """
+        initialize가 끝난 map으로 기록을 시작합니다.
+        같은 맵(같은 시작 보드)의 이전 기록이 있으면 이어서 쓰고,
+        가장 가까운 체크포인트부터 현재 상태까지의 보드 목록을 반환합니다. (MapManager.resume에 넘김)
+        이어 쓸 수 없으면 새로 시작하고 빈 목록을 반환합니다.
+        """
+        rows = tuple(map.board)
+        path: List[Rows] = []
+        try:
+            if self.load() and self.header.get('map') == map.name and self._checkpoints[0] == rows:
+                path = self.states_to(self._current)
+        except (ValueError, KeyError, TypeError, RecursionError):
+            path = []
+        if path:
+            if self._torn:
+                # 깨진 마지막 줄 뒤에 이어 쓰지 않도록 잘라 냄
+                os.truncate(self.path, self._valid_size)
+            self._open('a')
+            # 이전 REDO 구간은 History에 없으므로 기록에서도 끊음
+            self._write({'t': 'resume'})
+            self._redo = []
+            return path if self._current else []
+
+        self._clear()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._open('w')
+        header = {'t': 'start', 'version': JOURNAL_VERSION, 'map': map.name,
+                  'returnValue': map.returnValue, 'stepLimit': map.step_limit, 'rows': list(rows)}
+        self._write(header, sync=True)
+        self._apply(header)
+        return []
+
+    def _open(self, mode: str) -> None:
+        self.close()
+        self._file = open(self.path, mode, encoding='utf-8', newline='\n')
+
+    def _write(self, record: Dict[str, Any], sync: bool = False) -> None:
+        f = self._file
+        if f is None:
+            return
+        f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        f.flush()
+        if sync:
+            os.fsync(f.fileno())
+
+    def record_move(self, direction: Tuple[int, int], board) -> None:
+        """direction 이동으로 board가 된 새 상태를 기록합니다."""
+        rows = tuple(board)
+        crc = board_crc(rows)
+        state = self._new_state(direction, crc)
+        self._actions.append(state)
+        self._write({'t': 'move', 'd': list(direction), 'h': crc})
+        if self._since_checkpoint[state] >= self.checkpoint_interval:
+            self._checkpoints[state] = rows
+            self._since_checkpoint[state] = 0
+            self._write({'t': 'checkpoint', 'rows': list(rows)}, sync=True)
+
+    def record_undo(self) -> None:
+        self._apply({'t': 'undo'})
+        self._write({'t': 'undo'})
+
+    def record_redo(self) -> None:
+        self._apply({'t': 'redo'})
+        self._write({'t': 'redo'})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """세션이 정상적으로 끝났을 때 기록 파일을 지웁니다."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="세션 기록을 요약하거나 특정 시점의 보드를 출력합니다.")
+    parser.add_argument('journal', help="세션 기록 파일 (.journal/*.jsonl)")
+    parser.add_argument('--seek', type=int, help="이 번호의 기록 직후 보드를 출력 (0: 시작 상태)")
+    args = parser.parse_args(argv)
+
+    journal = SessionJournal(args.journal)
+    try:
+        if not journal.load():
+            print(f"세션 기록이 없습니다: {args.journal}", file=sys.stderr)
+            return 1
+        report: Dict[str, Any] = {
+            'map': journal.header['map'],
+            'actions': len(journal),
+            'states': len(journal._parents),
+            'checkpoints': len(journal._checkpoints),
+            'current': journal.current,
+        }
+        if args.seek is not None:
+            report.update(seek=args.seek, board=list(journal.seek(args.seek)))
+    except (OSError, ValueError, KeyError, IndexError) as e:
+        print(f"세션 기록 읽기 실패: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
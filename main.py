@@ -10,5 +10,10 @@ if __name__ == "__main__":
     sys.stdout.write("\033[?25l")
     sys.stdout.flush()
 
+    # --stats: 실행 통계를 처음부터 기록하고 상태창에 표시 (게임 중 S 키로 전환 가능)
+    if "--stats" in sys.argv[1:]:
+        from stats import STATS
+        STATS.enabled = True
+
     menu = Menu("mapdata.json")
     menu.run()
@@ -1,13 +1,84 @@
-from typing import List, Tuple, Optional, Dict
-import copy
-from concurrent.futures import ThreadPoolExecutor, Future
+from typing import TYPE_CHECKING, List, Tuple, Optional, Dict, Set
+from collections import OrderedDict
+import sys
 import threading
-from interpreter import interpret, get_board_inf
+from interpreter import interpret, get_board_inf, classify_row, DEFAULT_STEP_LIMIT
 from inf import Inf
+from board import Board
+from history import History, DEFAULT_MEMORY_BUDGET
+from stats import STATS, OVERLAY_LINES, StatsBuffer
 import 출력관련
+if TYPE_CHECKING:
+    from journal import SessionJournal
+    from concurrent.futures import ThreadPoolExecutor, Future
 #import winsound
 
 
+# ───── 렌더링 ─────
+# Inf별 ANSI 컬러 접두어 (모듈 로드 시 한 번만 생성)
+COLOR = {
+    Inf.NONE:      "\033[38;2;135;206;250m",
+    Inf.SEMICOLON: "\033[36m",
+    Inf.OP:        "\033[33m",
+    Inf.FUNC:      "\033[38;5;229m",
+    Inf.CONTROL:   "\033[35m",
+    Inf.BOX:       "\033[90m",
+    Inf.STRING:    "\033[38;2;255;200;100m",
+}
+RESET = "\033[0m"
+
+# 상태창 기본 로그 (이전 로그를 덮어쓰도록 공백으로 채움)
+DEFAULT_LOG = ".                                             "
+
+# 바뀐 칸 사이에 이보다 짧은 간격은 커서 이동 대신 그대로 다시 출력
+_RUN_GAP = 4
+
+
+def _colored_row(text: str, inf) -> str:
+    """문자열을 같은 Inf끼리 묶어 컬러 접두어를 붙인 문자열로 만듭니다."""
+    parts = []
+    start = 0
+    n = len(text)
+    for x in range(1, n + 1):
+        if x == n or inf[x] != inf[start]:
+            parts.append(COLOR[inf[start]])
+            parts.append(text[start:x])
+            start = x
+    parts.append(RESET)
+    return ''.join(parts)
+
+
+def _changed_runs(old_row: str, new_row: str, old_inf, new_inf) -> List[Tuple[int, int]]:
+    """바뀐 칸을 [start, stop) 구간 목록으로 묶습니다. 가까운 구간은 하나로 합칩니다."""
+    runs: List[Tuple[int, int]] = []
+    for x in range(len(new_row)):
+        if new_row[x] != old_row[x] or new_inf[x] != old_inf[x]:
+            if runs and x - runs[-1][1] < _RUN_GAP:
+                runs[-1] = (runs[-1][0], x + 1)
+            else:
+                runs.append((x, x + 1))
+    return runs
+
+
+def _status_text(game_map: "Map", log: str) -> str:
+    text = (
+        "화살표 이동    Q:종료  Z:UNDO  X:REDO  S:통계\n"
+        f"맵: {game_map.name}\n"
+        f"리턴값: {game_map.returnValue}\n"
+        f"{log}\n"
+    )
+    if STATS.enabled:
+        # 줄마다 끝까지 지워서 이전 값이 남지 않게 함
+        text += ''.join(line + "\033[K\n" for line in STATS.overlay())
+    return text
+
+
+def _write_frame(frame: List[str]) -> None:
+    """프레임 조각을 합쳐 한 번의 write로 출력합니다."""
+    sys.stdout.write(''.join(frame))
+    sys.stdout.flush()
+
+
 def _simulate_move(maplogic_snapshot: "Map", move: Tuple[int, int]):
     """
     단일 방향(dx, dy)에 대해 Mapmaplogic.move_and_execute를 호출하여
@@ -21,6 +92,45 @@ def _simulate_move(maplogic_snapshot: "Map", move: Tuple[int, int]):
         return (None, None, e)
 
 
+# 4방향 예측용 스레드 풀. 처음 예측할 때 만들고 모든 MapManager가 함께 사용
+_pool: Optional["ThreadPoolExecutor"] = None
+_pool_lock = threading.Lock()
+
+
+def _prediction_pool() -> "ThreadPoolExecutor":
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="predict")
+        return _pool
+
+
+class MoveCache:
+    """
+    (이동 전 보드 줄 목록, dx, dy) → (이동 후 줄 목록, 결과, board_inf) LRU 캐시.
+    같은 맵의 사본(snapshot)끼리 공유되고 예측 스레드에서도 접근하므로 잠금을 사용합니다.
+    """
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, value: tuple) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
 class Map:
     """
     현재 맵 상태를 보관하고, 플레이어 이동, board_inf 계산 및 interpret 호출을 담당하는 클래스
@@ -29,74 +139,259 @@ class Map:
     SEMICOLON = ';'
     WALL = '#'
 
-    def __init__(self, name: str, raw_data: List[str], returnValue):
+    def __init__(self, name: str, raw_data: List[str], returnValue, step_limit: Optional[int] = None,
+                 highlight: bool = True, board_inf: Optional[List[Tuple[Inf, ...]]] = None):
         self.name = name
         lines = raw_data
         self.H = len(lines)
         self.W = max(len(line) for line in lines) if lines else 0
-        # board[y][x] 형태로 저장
-        self.board: List[List[str]] = [list(line.ljust(self.W, self.EMPTY)) for line in lines]
+        # board[y][x] 형태로 접근 (board[y]는 줄 문자열)
+        self.board: Board = Board(line.ljust(self.W, self.EMPTY) for line in lines)
         self.returnValue = returnValue
-        # board_inf를 초기 계산
-        self.board_inf: List[List[Inf]] = get_board_inf(self)
+        # interpret 한 번에 허용되는 while 반복 횟수
+        self.step_limit = DEFAULT_STEP_LIMIT if step_limit is None else step_limit
+        # 미리 계산용 사본에서만 설정: set되면 interpret가 중단됨
+        self.cancel_event: Optional[threading.Event] = None
+        # 미리 계산용 사본에서만 설정: 통계를 여기 모아 두었다가 예측이 사용될 때만 더함
+        self.stats_buffer: Optional[StatsBuffer] = None
+        # 이동 결과 캐시 (snapshot과 공유)
+        self.move_cache = MoveCache()
+        # 줄마다 마지막으로 바뀐 시점을 기록 (캐시 무효화 기준)
+        self._clock = 0
+        self.row_versions: List[int] = [0] * self.H
+        # 줄마다 (버전, [(세미콜론 x, 코드), ...]) 캐시. interpreter.row_statements가 관리
+        self.statement_index: List[Optional[Tuple[int, List[Tuple[int, str]]]]] = [None] * self.H
+        # 문자 → 그 문자가 있는 칸(y * W + x) 집합. 빈칸은 저장하지 않음
+        self._positions: Dict[str, Set[int]] = {}
+        self._build_positions()
+        # 화면에 그리지 않는 경우(headless) 글자 분류를 생략. 이때 board_inf 줄은 빈 튜플
+        self.highlight = highlight
+        # board_inf를 초기 계산 (줄마다 Inf 튜플). 미리 계산한 값(맵 캐시)이 있으면 그대로 사용
+        if board_inf is not None:
+            self.board_inf: List[Tuple[Inf, ...]] = list(board_inf)
+        else:
+            self.board_inf = get_board_inf(self) if highlight else [()] * self.H
+        self._inf_versions: List[int] = list(self.row_versions)
+        # 이미 initialize된 상태로 만든 경우 그 결과 (initialize가 interpret를 다시 하지 않음)
+        self.initial_result: Optional[bool] = None
+
+    def _touch_row(self, y: int) -> None:
+        """y번째 줄이 바뀌었음을 기록합니다."""
+        self._clock += 1
+        self.row_versions[y] = self._clock
+
+    def _build_positions(self) -> None:
+        """보드 전체를 훑어 문자 위치 색인을 새로 만듭니다."""
+        positions: Dict[str, Set[int]] = {}
+        for y, row in enumerate(self.board):
+            base = y * self.W
+            for x, ch in enumerate(row):
+                if ch != self.EMPTY:
+                    positions.setdefault(ch, set()).add(base + x)
+        self._positions = positions
+        # snapshot과 공유 중인 위치 집합의 문자 (쓰기 전에 복제해야 함)
+        self._shared_positions: Set[str] = set()
+
+    def _move_position(self, old: str, new: str, cell: int) -> None:
+        """칸 하나가 old에서 new로 바뀐 것을 위치 색인에 반영합니다."""
+        if old != self.EMPTY:
+            cells = self._own_positions(old)
+            cells.discard(cell)
+            if not cells:
+                del self._positions[old]
+        if new != self.EMPTY:
+            self._own_positions(new).add(cell)
+
+    def _own_positions(self, ch: str) -> Set[int]:
+        """ch의 위치 집합을 반환합니다. snapshot과 공유 중이면 먼저 복제합니다."""
+        cells = self._positions.get(ch)
+        if cells is None:
+            cells = self._positions[ch] = set()
+        elif ch in self._shared_positions:
+            cells = self._positions[ch] = set(cells)
+            self._shared_positions.discard(ch)
+        return cells
+
+    def positions(self, ch) -> List[Tuple[int, int]]:
+        """
+        ch가 있는 모든 좌표 (x, y)를 위에서 아래, 왼쪽에서 오른쪽 순서로 반환합니다.
+        빈칸을 제외하면 색인을 사용하므로 찾은 개수에 비례하는 시간이 듭니다.
+        """
+        if ch == self.EMPTY:
+            return [(x, y) for y, row in enumerate(self.board) for x, c in enumerate(row) if c == ch]
+        cells = self._positions.get(ch)
+        if not cells:
+            return []
+        W = self.W
+        return [(cell % W, cell // W) for cell in sorted(cells)]
+
+    def rows_containing(self, ch: str) -> List[int]:
+        """한 글자 ch가 들어 있는 줄 번호를 위에서부터 반환합니다."""
+        if ch == self.EMPTY:
+            return [y for y, row in enumerate(self.board) if ch in row]
+        W = self.W
+        return sorted({cell // W for cell in self._positions.get(ch, ())})
+
+    def set_cell(self, x: int, y: int, ch: str) -> None:
+        """board[y][x]에 ch를 기록합니다. 실제로 바뀐 경우에만 줄을 변경 표시합니다."""
+        old = self.board[y][x]
+        if self.board.set(x, y, ch):
+            self._move_position(old, ch, y * self.W + x)
+            self._touch_row(y)
+
+    def set_row(self, y: int, chars) -> None:
+        """y번째 줄 전체를 chars(문자열 또는 글자 목록)로 교체합니다."""
+        text = chars if isinstance(chars, str) else ''.join(chars)
+        old = self.board[y]
+        if self.board.set_row(y, text):
+            base = y * self.W
+            for x, (a, b) in enumerate(zip(old, text)):
+                if a != b:
+                    self._move_position(a, b, base + x)
+            self._touch_row(y)
+
+    def set_cells(self, y: int, cells) -> None:
+        """y번째 줄의 여러 칸을 한 번에 바꿉니다. cells는 (x, 글자) 목록이며 줄 문자열은 한 번만 만듭니다."""
+        old = self.board[y]
+        chars = list(old)
+        for x, ch in cells:
+            chars[x] = ch
+        if self.board.set_row(y, ''.join(chars)):
+            base = y * self.W
+            for x, ch in cells:
+                if old[x] != ch:
+                    self._move_position(old[x], ch, base + x)
+            self._touch_row(y)
+
+    def set_board(self, board) -> None:
+        """보드 전체를 교체하고 모든 줄을 변경 표시합니다."""
+        self.board = board.copy() if isinstance(board, Board) else Board(board)
+        self.H = len(self.board)
+        self.W = len(self.board[0]) if self.board else 0
+        self._clock += 1
+        self.row_versions = [self._clock] * self.H
+        self.statement_index = [None] * self.H
+        self._build_positions()
+
+    def snapshot(self) -> 'Map':
+        """
+        현재 맵의 사본을 만듭니다.
+        줄 문자열, board_inf 줄, 문자 위치 집합은 원본과 공유하고
+        어느 한쪽이 쓸 때만 그 부분을 복제하므로 deepcopy보다 훨씬 가볍습니다.
+        """
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.board = self.board.copy()
+        clone.row_versions = list(self.row_versions)
+        clone.statement_index = list(self.statement_index)
+        clone.board_inf = list(self.board_inf)
+        clone._inf_versions = list(self._inf_versions)
+        clone._positions = dict(self._positions)
+        clone._shared_positions = set(self._positions)
+        self._shared_positions = set(self._positions)
+        return clone
+
+    def restore(self, board, board_inf) -> None:
+        """
+        저장해 둔 board와 board_inf로 되돌립니다.
+        바뀐 줄만 교체하며, board_inf는 다시 계산하지 않고 그대로 사용합니다.
+        """
+        if len(board) != self.H:
+            self.set_board(board)
+        else:
+            for y, row in enumerate(board):
+                if row is not self.board[y]:
+                    self.set_row(y, row)
+        self.board_inf = list(board_inf)
+        self._inf_versions = list(self.row_versions)
 
     def find_players(self) -> List[Tuple[int, int]]:
         """현재 보드 위에 있는 모든 플레이어(';') 좌표를 반환합니다."""
-        return [
-            (x, y)
-            for y in range(self.H)
-            for x in range(self.W)
-            if self.board[y][x] == self.SEMICOLON
-        ]
-
-    def move_block(self, x: int, y: int, dx: int, dy: int) -> bool:
+        return self.positions(self.SEMICOLON)
+
+    def _chain_end(self, x: int, y: int, dx: int, dy: int, cell_at) -> Optional[Tuple[int, int]]:
         """
-        (x, y)에 있는 블록을 (dx, dy) 방향으로 밀어봅니다.
-        - 앞이 빈칸이면 블록 이동 가능
-        - 앞이 고정 블록('#') 또는 플레이어(';')면 이동 불가
-        - 재귀적으로 앞 블록을 밀어 비운 뒤 현재 블록을 이동
+        (x, y) 앞으로 이어진 밀 수 있는 블록들을 따라가 처음 나오는 빈칸 좌표를 반환합니다.
+        - 앞이 빈칸이면 그 칸 (밀 블록 없음)
+        - 블록 줄 끝이 고정 블록('#'), 플레이어(';'), 보드 밖이면 None (이동 불가)
+        cell_at(x, y)로 칸을 읽으므로 아직 보드에 쓰지 않은 변경도 반영할 수 있습니다.
         """
+        W, H = self.W, self.H
         nx, ny = x + dx, y + dy
-        if not (0 <= nx < self.W and 0 <= ny < self.H):
-            return False
-
-        target = self.board[ny][nx]
-        if target == self.EMPTY:
-            return True
-        if target == self.WALL or target == self.SEMICOLON:
-            return False
-
-        if not self.move_block(nx, ny, dx, dy):
-            return False
-
-        # 앞 칸이 비워졌으니 현재 블록 이동
-        self.board[ny + dy][nx + dx] = target
-        self.board[ny][nx] = self.EMPTY
-        return True
+        while 0 <= nx < W and 0 <= ny < H:
+            target = cell_at(nx, ny)
+            if target == self.EMPTY:
+                return nx, ny
+            if target == self.WALL or target == self.SEMICOLON:
+                return None
+            nx, ny = nx + dx, ny + dy
+        return None
 
     def move_player(self, dx: int, dy: int) -> bool:
         """
         모든 플레이어를 (dx, dy) 방향으로 이동시도합니다.
-        - 이동 가능한 블록들을 재귀적으로 밀고, 플레이어를 한 칸 이동합니다.
+        - 진행 방향으로 가장 앞에 있는 플레이어부터 처리하므로,
+          같은 줄에 늘어선 플레이어는 앞 플레이어가 비운 칸으로 뒤 플레이어가 따라 들어갑니다.
+          (예전에는 보드를 훑는 순서대로 처리해서 오른쪽/아래로 이동할 때만 뒤 플레이어가 막혔음)
+        - 밀리는 블록 줄은 재귀 없이 따라가 끝의 빈칸을 찾고,
+          바뀐 칸은 변경 목록에 모아 두었다가 줄마다 한 번에 보드에 씁니다.
+        블록 줄을 따라가는 시간과 실제로 바뀐 칸 수에 비례하는 시간이 듭니다.
         """
         players = self.find_players()
+        if not players:
+            return True
+        board = self.board
+        # 아직 보드에 쓰지 않은 변경: (x, y) → 글자
+        pending: Dict[Tuple[int, int], str] = {}
+
+        def cell_at(cx: int, cy: int) -> str:
+            ch = pending.get((cx, cy))
+            return board[cy][cx] if ch is None else ch
+
+        # 진행 방향으로 앞에 있는 플레이어부터 (다른 줄끼리는 서로 영향이 없음)
+        players.sort(key=lambda p: p[0] * dx + p[1] * dy, reverse=True)
         for x, y in players:
-            if not self.move_block(x, y, dx, dy):
+            end = self._chain_end(x, y, dx, dy, cell_at)
+            if end is None:
                 continue
-            self.board[y][x] = self.EMPTY
-            nx, ny = x + dx, y + dy
-            self.board[ny][nx] = self.SEMICOLON
+            # 블록 줄을 한 칸씩 앞으로: 끝의 빈칸부터 플레이어 칸까지 거꾸로 당겨 채움
+            ex, ey = end
+            while (ex, ey) != (x, y):
+                px, py = ex - dx, ey - dy
+                pending[(ex, ey)] = cell_at(px, py)
+                ex, ey = px, py
+            pending[(x, y)] = self.EMPTY
+
+        # 줄마다 모아서 한 번에 기록
+        rows: Dict[int, List[Tuple[int, str]]] = {}
+        for (cx, cy), ch in pending.items():
+            rows.setdefault(cy, []).append((cx, ch))
+        for cy, cells in rows.items():
+            self.set_cells(cy, cells)
         return True
 
     def _update_inf(self):
-        """현재 board 상태를 바탕으로 board_inf를 갱신합니다."""
-        self.board_inf = get_board_inf(self)
+        """지난 갱신 이후 바뀐 줄만 다시 분류하여 board_inf를 갱신합니다."""
+        if not self.highlight:
+            if len(self.board_inf) != self.H:
+                self.board_inf = [()] * self.H
+        elif len(self.board_inf) != self.H:
+            self.board_inf = get_board_inf(self)
+        else:
+            for y, version in enumerate(self.row_versions):
+                if self._inf_versions[y] != version:
+                    self.board_inf[y] = classify_row(self.board[y])
+        self._inf_versions = list(self.row_versions)
 
     def initialize(self):
         """
         최초 해석/실행을 수행하고 결과를 반환합니다.
         이후 board_inf를 갱신합니다.
+        initial_result가 있으면 보드가 이미 실행 후 상태이므로 그 결과만 반환합니다.
         """
+        if self.initial_result is not None:
+            result, self.initial_result = self.initial_result, None
+            return result
         result = interpret(self)
         self._update_inf()
         return result
@@ -105,10 +400,25 @@ class Map:
         """
         플레이어를 이동시키고 interpret을 호출하여 명령어를 실행한 뒤 결과를 반환합니다.
         실행 후 board_inf를 갱신합니다.
+        결과는 보드와 방향만으로 정해지므로, 이미 계산한 (보드, 방향)이면 캐시에서 복원합니다.
         """
+        key = (tuple(self.board), dx, dy)
+        cached = self.move_cache.get(key)
+        if cached is not None:
+            STATS.count('캐시 적중', 1, self.stats_buffer)
+            board, result, board_inf = cached
+            self.restore(board, board_inf)
+            return result
+        start = STATS.start()
         self.move_player(dx, dy)
+        STATS.stop('move', start, self.stats_buffer)
+        start = STATS.start()
         result = interpret(self)
+        STATS.stop('interpret', start, self.stats_buffer)
+        start = STATS.start()
         self._update_inf()
+        STATS.stop('classify', start, self.stats_buffer)
+        self.move_cache.put(key, (tuple(self.board), result, tuple(self.board_inf)))
         return result
 
 
@@ -119,46 +429,87 @@ class MapManager:
     - 다음 4방향에 대한 비동기 예측 (멀티프로세싱)
     - 맵 렌더링 (전체 또는 변경된 부분만 갱신)
     를 담당하는 클래스입니다.
+    auto_render=False이면 상태가 바뀌어도 바로 그리지 않고 프레임만 남겨 두며,
+    그리는 쪽(예: Game의 렌더 작업)이 take_frame()으로 가장 최근 프레임을 가져갑니다.
     """
     # 예측할 4가지 방향: 위, 아래, 왼쪽, 오른쪽
     _NEXT_MOVES = [(0, -1), (0, 1), (-1, 0), (1, 0)]
 
-    def __init__(self, maplogic: Map):
+    def __init__(self, maplogic: Map, history_budget: int = DEFAULT_MEMORY_BUDGET,
+                 auto_render: bool = True):
         self.maplogic = maplogic
-        self._history, self._future = [], []
+        self.auto_render = auto_render
+        # UNDO/REDO 타임라인 (변경 묶음 + 주기적 체크포인트)
+        self._history = History(maplogic.board, maplogic.board_inf, memory_budget=history_budget)
 
-        self.past_board = [row.copy() for row in maplogic.board]
+        self.past_board = maplogic.board.copy()
         self.past_board_inf = None
 
-        self._pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=8)
-        self._pred_future: Optional[Future] = None   # 단일 future
-        self._pred_dir:    Optional[Tuple[int, int]] = None
+        # 방향 → (future, 취소 이벤트, 통계 버퍼). 모두 _pred_generation 세대의 보드에서 계산됨
+        self._predictions: Dict[Tuple[int, int], Tuple["Future", threading.Event, StatsBuffer]] = {}
+        self._generation = 0        # 보드가 바뀔 때마다 증가
+        self._pred_generation = -1
         self._lock = threading.Lock()
 
-        self._last_dir: Optional[Tuple[int, int]] = None  # 직전 사용자가 이동한 방향
 
-    def save_state(self):
-        """현재 로직의 board를 deep copy하여 히스토리에 저장하고 REDO 스택 초기화."""
-        self._history.append(copy.deepcopy(self.maplogic.board))
-        self._future.clear()
+        # 아직 그리지 않은 가장 최근 프레임 (board, board_inf, log)
+        self._frame: Optional[tuple] = None
+        self._frame_lock = threading.Lock()
+
+        # 이동/UNDO/REDO를 파일에 남기는 세션 기록 (선택. Game이 연결함)
+        self.journal: Optional["SessionJournal"] = None
+
+    def save_state(self, direction: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        현재 로직의 board를 히스토리에 기록하고 REDO 구간을 버립니다. 바뀐 게 없으면 기록하지 않음.
+        direction이 있으면 세션 기록에도 이동으로 남깁니다.
+        """
+        self._generation += 1
+        recorded = self._history.record(self.maplogic.board, self.maplogic.board_inf)
+        if recorded and direction is not None:
+            self._record('record_move', direction, self.maplogic.board)
+        return recorded
+
+    def _record(self, action: str, *args) -> None:
+        """세션 기록에 남깁니다. 파일 쓰기에 실패하면 기록만 멈추고 게임은 계속합니다."""
+        if self.journal is None:
+            return
+        try:
+            getattr(self.journal, action)(*args)
+        except (OSError, ValueError):
+            self.journal.close()
+            self.journal = None
+
+    def resume(self, states: List[Tuple[str, ...]]) -> None:
+        """
+        세션 기록에서 되살린 보드들(오래된 것부터, 마지막이 현재)로 보드와 히스토리를 만듭니다.
+        이 보드들 사이에서는 UNDO/REDO할 수 있습니다.
+        """
+        maplogic = self.maplogic
+        for i, rows in enumerate(states):
+            for y, row in enumerate(rows):
+                maplogic.set_row(y, row)
+            maplogic._update_inf()
+            if i == 0:
+                self._history.reset(maplogic.board, maplogic.board_inf)
+            else:
+                self._history.record(maplogic.board, maplogic.board_inf)
+        self._generation += 1
 
     def undo(self,log=".                                  ") -> bool:
         """
         이전 상태로 되돌립니다. 성공 시 True, 실패 시 False.
-        성공 시 maplogic.board, H, W, board_inf가 복원됩니다.
+        성공 시 maplogic.board와 board_inf가 저장된 값으로 복원됩니다.
         """
-        if not self._history:
+        state = self._history.undo()
+        if state is None:
             return False
-        # 현재 보드를 REDO 스택에 저장
-        self._future.append(copy.deepcopy(self.maplogic.board))
-        prev_state = self._history.pop()
-        self.maplogic.board = copy.deepcopy(prev_state)
-        self.maplogic.H = len(prev_state)
-        self.maplogic.W = len(prev_state[0]) if prev_state else 0
-        self.maplogic._update_inf()
-        # 예측된 데이터는 더 이상 유효하지 않으므로 초기화
-        self._clear_future()
-        self.render(log=log)
+        self.maplogic.restore(*state)
+        self._generation += 1
+        self._record('record_undo')
+        self._publish(log=log)
+        # 예측된 데이터는 더 이상 유효하지 않으므로 새 보드 기준으로 다시 예측
+        self._precompute_next_moves()
         #winsound.Beep(1000, 500)
         return True
 
@@ -166,175 +517,174 @@ class MapManager:
         """
         UNDO 이후 다시 앞으로 진행합니다. 성공 시 True, 실패 시 False.
         """
-        if not self._future:
+        state = self._history.redo()
+        if state is None:
             return False
-        self._history.append(copy.deepcopy(self.maplogic.board))
-        next_state = self._future.pop()
-        self.maplogic.board = copy.deepcopy(next_state)
-        self.maplogic.H = len(next_state)
-        self.maplogic.W = len(next_state[0]) if next_state else 0
-        self.maplogic._update_inf()
-        # 예측된 데이터는 더 이상 유효하지 않으므로 초기화
-        self._clear_future()
-        self.render()
+        self.maplogic.restore(*state)
+        self._generation += 1
+        self._record('record_redo')
+        self._publish()
+        # 예측된 데이터는 더 이상 유효하지 않으므로 새 보드 기준으로 다시 예측
+        self._precompute_next_moves()
         return True
 
-    def _precompute_next_move(self, direction: Tuple[int, int]) -> None:
-        """direction 한 가지만 미리 계산"""
+    def _revert(self, log) -> None:
+        """실패한 이동을 취소하고 히스토리의 현재 상태로 되돌립니다."""
+        self.maplogic.restore(*self._history.current())
+        self._generation += 1
+        self._publish(log=log)
+
+    def _precompute_next_moves(self) -> None:
+        """4방향 모두를 현재 보드 기준으로 미리 계산 (이전 예측은 취소)"""
         self._clear_future()
-        maplogic_copy = copy.deepcopy(self.maplogic)
-        self._pred_future = self._pool.submit(_simulate_move, maplogic_copy, direction)
-        self._pred_dir    = direction
+        self._pred_generation = self._generation
+        for direction in self._NEXT_MOVES:
+            maplogic_copy = self.maplogic.snapshot()
+            maplogic_copy.cancel_event = threading.Event()
+            maplogic_copy.stats_buffer = StatsBuffer()
+            future = _prediction_pool().submit(_simulate_move, maplogic_copy, direction)
+            self._predictions[direction] = (future, maplogic_copy.cancel_event, maplogic_copy.stats_buffer)
+
+    def _take_prediction(self, direction: Tuple[int, int]) -> Optional[Tuple["Future", StatsBuffer]]:
+        """
+        현재 보드 세대에서 계산된 direction 예측의 (future, 통계 버퍼)를 꺼내고, 나머지 방향은 취소합니다.
+        세대가 다르면(보드가 그 사이 바뀌었으면) None.
+        """
+        prediction = None
+        if self._pred_generation == self._generation:
+            prediction = self._predictions.pop(direction, None)
+        self._clear_future()
+        return (prediction[0], prediction[2]) if prediction else None
 
     def _clear_future(self):
-        self._pred_future = None
-        self._pred_dir    = None
+        """진행 중인 예측을 모두 취소합니다. 실행 중인 계산은 다음 확인 시점에 스스로 멈춥니다."""
+        for future, cancel_event, _ in self._predictions.values():
+            cancel_event.set()
+            future.cancel()
+        self._predictions = {}
 
     def initialize(self):
         res = self.maplogic.initialize()
-        #self.save_state()            # 첫 상태 저장
+        # 첫 상태를 히스토리의 시작점으로 저장
+        self._history.reset(self.maplogic.board, self.maplogic.board_inf)
         # 아직 사용자가 움직인 적이 없으므로 예측은 건너뛰어도 된다.
         return res
 
     def move_and_execute(self, dx: int, dy: int):
-        # (3) 히스토리 저장
-        if not self._history or self._history[-1] != self.maplogic.board:
-            self.save_state()
         direction = (dx, dy)
-        # (1) 직전 방향 예측이 있고 완료됐다면 사용
-        if self._pred_dir == direction and self._pred_future and self._pred_future.done():
-            maplogic_copy, result, exc = self._pred_future.result()
+        # (1) 같은 보드 세대에서 이 방향 예측이 있으면 사용 (계산 중이면 끝날 때까지 대기)
+        prediction = self._take_prediction(direction)
+        STATS.count('예측 적중' if prediction is not None else '예측 실패')
+        if prediction is not None:
+            future, stats_buffer = prediction
+            maplogic_copy, result, exc = future.result()
+            # 실제로 한 이동이 되었으므로 예측하는 동안 모아 둔 통계를 반영
+            STATS.merge(stats_buffer)
             #winsound.Beep(1000, 500)
-            self._clear_future()
             if exc:
-                self.undo(log=exc)
+                self._revert(log=exc)
                 result=True
             elif maplogic_copy is not self.maplogic:
                 with self._lock:
+                    maplogic_copy.cancel_event = None
+                    maplogic_copy.stats_buffer = None
                     self.maplogic = maplogic_copy
-                    self.render()
+                    # (3) 히스토리 저장
+                    self.save_state(direction)
+                    self._publish()
 
         else:
-            # (2) 예측 없거나 미완료 → 동기 실행
+            # (2) 예측 없음 → 동기 실행
             with self._lock:
                 try:
                     result = self.maplogic.move_and_execute(dx, dy)
-                    self.render()
+                    # (3) 히스토리 저장
+                    self.save_state(direction)
+                    self._publish()
                 except RecursionError as e:
-                    self.undo(log=e)
+                    self._revert(log=e)
                     result=True
         if result is False:          # 이동 불가
             self._clear_future()
             return False
 
-        
-
-        # (4) 방금 방향을 기록하고, 같은 방향을 다시 예측
-        self._last_dir = direction
-        self._precompute_next_move(direction)
+        # (4) 다음 입력에 대비해 4방향을 모두 예측
+        self._precompute_next_moves()
         return result
 
-    def render_all(self, log: str):
-        """보드 전체를 ANSI 컬러 적용하여 출력합니다."""
+    def _publish(self, log: str = DEFAULT_LOG):
+        """바뀐 상태를 화면에 반영합니다. auto_render가 아니면 프레임만 교체해 둡니다."""
+        if self.auto_render:
+            self.render(log)
+            return
+        frame = (self.maplogic.board.copy(), list(self.maplogic.board_inf), log)
+        with self._frame_lock:
+            self._frame = frame
+
+    def refresh(self, log: str = DEFAULT_LOG):
+        """상태는 그대로 두고 화면만 다시 그리도록 요청합니다. (예: 통계 표시 전환)"""
+        self._publish(log)
+
+    def take_frame(self) -> Optional[tuple]:
+        """아직 그리지 않은 가장 최근 프레임을 꺼냅니다. 그 사이 덮어쓴 프레임은 버려집니다."""
+        with self._frame_lock:
+            frame, self._frame = self._frame, None
+        return frame
+
+    def render_all(self, log: str, board: Board, board_inf: List[Tuple[Inf, ...]]):
+        """보드 전체를 ANSI 컬러 적용하여 한 프레임으로 만들어 한 번에 출력합니다."""
         game_map = self.maplogic
-        W, H = game_map.W, game_map.H
-        board = game_map.board
-        board_inf = game_map.board_inf
-
-        # 1) 맵 상단
-        print(' ' + '_' * W)
-
-        # 2) ANSI 컬러 매핑
-        COLOR = {
-            Inf.NONE:      "\033[38;2;135;206;250m",
-            Inf.SEMICOLON: "\033[36m",
-            Inf.OP:        "\033[33m",
-            Inf.FUNC:      "\033[38;5;229m",
-            Inf.CONTROL:   "\033[35m",
-            Inf.BOX:       "\033[90m",
-            Inf.STRING:    "\033[38;2;255;200;100m",
-        }
-        RESET = "\033[0m"
-
-        # 3) 각 행 출력
-        for i in range(H):
-            print('|', end='')
-            buffer = ''
-            prev_type = board_inf[i][0]
-            for j in range(W):
-                cur_type = board_inf[i][j]
-                ch = board[i][j]
-                if cur_type != prev_type:
-                    print(f"{COLOR[prev_type]}{buffer}{RESET}", end='')
-                    buffer = ch
-                    prev_type = cur_type
-                else:
-                    buffer += ch
-            print(f"{COLOR[prev_type]}{buffer}{RESET}", end='')
-            print('|')
-
-        # 4) 맵 하단
-        print(' ' + '‾' * W)
-
-        # 5) 상태창
-        print("\n화살표 이동    Q:종료  Z:UNDO  X:REDO")
-        print("맵:", game_map.name)
-        print("리턴값:", game_map.returnValue)
-        print(log)
-
-        # 6) 이후 diff를 위해 현재 상태 저장
-        self.past_board = [row.copy() for row in board]
-        self.past_board_inf = [row.copy() for row in board_inf]
-
-    def render_diff(self, log: str):
-        """이전 보드와 Inf 정보를 기반으로 변경된 부분만 갱신 출력합니다."""
+        W = game_map.W
+
+        frame = [' ' + '_' * W + '\n']                     # 맵 상단
+        for row, row_inf in zip(board, board_inf):
+            frame.append('|' + _colored_row(row, row_inf) + '|\n')
+        frame.append(' ' + '‾' * W + '\n')                 # 맵 하단
+        frame.append('\n' + _status_text(game_map, log))   # 상태창
+        frame.append("\033[J")                              # 아래에 남은 이전 출력 지우기
+        _write_frame(frame)
+
+        # 이후 diff를 위해 현재 상태 저장
+        self.past_board = board.copy()
+        self.past_board_inf = list(board_inf)
+
+    def render_diff(self, log: str, board: Board, new_board_inf: List[Tuple[Inf, ...]]):
+        """이전 보드와 Inf 정보를 비교해 바뀐 구간만 한 번에 갱신 출력합니다."""
         game_map = self.maplogic
-        W, H = game_map.W, game_map.H
-        board = game_map.board
-        new_board_inf = game_map.board_inf
-
-        COLOR = {
-            Inf.NONE:      "\033[38;2;135;206;250m",
-            Inf.SEMICOLON: "\033[36m",
-            Inf.OP:        "\033[33m",
-            Inf.FUNC:      "\033[38;5;229m",
-            Inf.CONTROL:   "\033[35m",
-            Inf.BOX:       "\033[90m",
-            Inf.STRING:    "\033[38;2;255;200;100m",
-        }
-        RESET = "\033[0m"
-
-        for y in range(H):
-            for x in range(W):
-                old_ch = self.past_board[y][x]
-                new_ch = board[y][x]
-                old_type = self.past_board_inf[y][x] if self.past_board_inf else None
-                new_type = new_board_inf[y][x]
-                if new_ch != old_ch or new_type != old_type:
-                    # 커서를 (y+2, x+2)로 이동 (1행: 상단 테두리, 1열: '|' 기호)
-                    print(f"\033[{y+2};{x+2}H", end='')
-                    print(f"{COLOR[new_type]}{new_ch}{RESET}", end='')
+        past_board, past_inf = self.past_board, self.past_board_inf
+
+        frame = []
+        for y, (new_row, new_inf) in enumerate(zip(board, new_board_inf)):
+            old_row, old_inf = past_board[y], past_inf[y]
+            if new_row == old_row and new_inf == old_inf:
+                continue
+            for start, stop in _changed_runs(old_row, new_row, old_inf, new_inf):
+                # 커서를 (y+2, start+2)로 이동 (1행: 상단 테두리, 1열: '|' 기호)
+                frame.append(f"\033[{y+2};{start+2}H")
+                frame.append(_colored_row(new_row[start:stop], new_inf[start:stop]))
 
         # 상태창 갱신
-        status_row = H + 4
-        print(f"\033[{status_row};1H", end='')
-        print("화살표 이동    Q:종료  Z:UNDO  X:REDO")
-        print(f"맵: {game_map.name}")
-        print(f"리턴값: {game_map.returnValue}")
-        print(log)
-
-        # 7) 이후 diff를 위해 현재 상태 저장
-        self.past_board = [row.copy() for row in board]
-        self.past_board_inf = [row.copy() for row in new_board_inf]
-
-    def render(self, log: str = ".                                             "):
+        frame.append(f"\033[{len(board) + 4};1H")
+        frame.append(_status_text(game_map, log))
+        frame.append("\033[J")
+        _write_frame(frame)
+
+        # 이후 diff를 위해 현재 상태 저장
+        self.past_board = board.copy()
+        self.past_board_inf = list(new_board_inf)
+
+    def render(self, log: str = DEFAULT_LOG):
+        """현재 maplogic 상태를 바로 그립니다."""
+        self.draw(self.maplogic.board, self.maplogic.board_inf, log)
+
+    def draw(self, board: Board, board_inf: List[Tuple[Inf, ...]], log: str = DEFAULT_LOG):
         """
         출력 전처리를 수행한 뒤,
         past_board_inf가 None이면 전체 렌더, 아니면 변경된 부분만 렌더합니다.
         """
-        H = self.maplogic.H
-        r = 출력관련.출력전처리(H + 7)
-        if not r or self.past_board_inf is None:
-            self.render_all(log)
+        H = len(board)
+        r = 출력관련.출력전처리(H + 7 + (OVERLAY_LINES if STATS.enabled else 0))
+        if not r or self.past_board_inf is None or len(self.past_board) != H:
+            self.render_all(log, board, board_inf)
         else:
-            self.render_diff(log)
+            self.render_diff(log, board, board_inf)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import pickle
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from catalog import MapCatalog, MapInfo, atomic_write
+from inf import Inf
+from map_module import Map
+
+'''
+미리 처리해 둔 맵 캐시
+
+맵마다 패딩된 보드, 처음 board_inf, initialize(첫 interpret) 후 상태와 결과를
+mapdata.json 옆 .mapcache 폴더에 pickle로 저장해 두고,
+다음부터는 파일 하나를 읽어 바로 Map을 만든다. (줄 패딩, 분류, 첫 interpret 생략)
+
+파일 이름은 원본 맵 내용(data 바이트 + returnValue + stepLimit), 실행 규칙 모듈들의 소스,
+CACHE_VERSION의 해시이므로 맵이나 인터프리터/명령/글자 분류 코드가 바뀌면
+자동으로 다른 파일을 찾게 되어 이전 캐시는 쓰이지 않는다.
+initialize에서 무한루프가 나는 맵은 저장하지 않는다.
+'''
+
+# 캐시 파일(CachedMap) 형식이 바뀌면 올릴 것. 규칙 코드의 변경은 RULE_MODULES 해시로 반영됨
+CACHE_VERSION = 1
+
+# 저장된 결과(initialize 후 보드, board_inf)를 정하는 모듈
+RULE_MODULES = (
+    "interpreter.py", "command_parser.py", "command_executer.py",
+    "variablemap.py", "inf.py", "board.py", "map_module.py",
+)
+
+InfRows = Tuple[Tuple[Inf, ...], ...]
+
+
+class CachedMap(NamedTuple):
+    content_hash: str
+    rows: Tuple[str, ...]           # 패딩된 처음 보드
+    board_inf: InfRows              # 처음 board_inf
+    result: bool                    # initialize 결과
+    init_rows: Tuple[str, ...]      # initialize 후 보드
+    init_board_inf: InfRows         # initialize 후 board_inf
+
+
+@lru_cache(maxsize=None)
+def rules_fingerprint() -> str:
+    """RULE_MODULES 소스의 해시 (프로세스마다 한 번만 계산)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for name in RULE_MODULES:
+        h.update(name.encode() + b"\0")
+        with open(os.path.join(here, name), 'rb') as f:
+            h.update(f.read())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def content_hash(raw_data: bytes, info: MapInfo) -> str:
+    """맵 원본 내용과 실행 규칙의 해시 (캐시 파일 이름 겸 무효화 기준)"""
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0".encode())
+    h.update(rules_fingerprint().encode() + b"\0")
+    h.update(json.dumps([info.returnValue, info.stepLimit], ensure_ascii=False).encode())
+    h.update(b"\0")
+    h.update(raw_data)
+    return h.hexdigest()
+
+
+class MapCache:
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def beside(cls, mapdata_file: str) -> 'MapCache':
+        """mapdata_file과 같은 폴더의 .mapcache를 사용합니다."""
+        return cls(os.path.join(os.path.dirname(os.path.abspath(mapdata_file)), ".mapcache"))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pickle")
+
+    def load(self, key: str) -> Optional[CachedMap]:
+        """key에 해당하는 캐시 항목. 없거나 읽을 수 없으면 None."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # 깨졌거나 다른 형식의 파일은 없는 것으로 취급 (다시 만들어 덮어씀)
+            return None
+        if not isinstance(entry, CachedMap) or entry.content_hash != key:
+            return None
+        return entry
+
+    def store(self, entry: CachedMap) -> None:
+        """캐시 항목을 저장합니다. 저장에 실패해도 게임 진행에는 영향이 없으므로 무시합니다."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            atomic_write(self._path(entry.content_hash), pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+
+    def build(self, name: str, raw_data: bytes, info: MapInfo) -> CachedMap:
+        """
+        맵을 처음부터 만들고 initialize까지 실행해 캐시 항목을 만듭니다.
+        initialize에서 발생한 RecursionError는 그대로 전달됩니다.
+        """
+        key = content_hash(raw_data, info)
+        map = Map(name, json.loads(raw_data), info.returnValue, info.stepLimit)
+        rows, board_inf = tuple(map.board), tuple(map.board_inf)
+        result = map.initialize()
+        return CachedMap(key, rows, board_inf, result, tuple(map.board), tuple(map.board_inf))
+
+    def load_map(self, catalog: MapCatalog, name: str) -> Map:
+        """
+        name 맵을 initialize 후 상태로 만들어 반환합니다.
+        반환된 Map의 initialize()는 interpret 없이 저장된 결과를 돌려줍니다.
+        """
+        info = catalog.info(name)
+        raw = catalog.load_raw(name)
+        entry = self.load(content_hash(raw, info))
+        if entry is None:
+            entry = self.build(name, raw, info)
+            self.store(entry)
+        map = Map(name, entry.init_rows, info.returnValue, info.stepLimit, board_inf=entry.init_board_inf)
+        map.initial_result = entry.result
+        return map
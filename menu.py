@@ -1,96 +1,68 @@
 import os
 import sys
-import json
-from map_module import Map
-from game import Game
-from typing import Dict, Any
+from typing import Optional
+from catalog import MapCatalog, ProgressStore
 import 출력관련
+from 입력관련 import KeyReader
+# game / mapcache (인터프리터, asyncio 등)는 맵을 처음 실행할 때 불러옴 → 메뉴가 빨리 뜸
 
 
-# ────────── 키 입력 처리 (Windows / Unix) ──────────
-try:
-    import msvcrt
-    def get_key():
-        ch = msvcrt.getwch()
-        if ch == '\xe0':  # 화살표 키
-            ch2 = msvcrt.getwch()
-            return {'H': 'UP', 'P': 'DOWN', 'K': 'LEFT', 'M': 'RIGHT'}.get(ch2, '')
-        return ch
-    def key_pressed():
-        return msvcrt.kbhit()
-except ImportError:
-    import tty, termios, select
-    def get_key():
-        fd = sys.stdin.fileno()
-        old = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':  # 화살표 키 시작
-                seq = sys.stdin.read(2)
-                return {'[A': 'UP', '[B': 'DOWN', '[D': 'LEFT', '[C': 'RIGHT'}.get(seq, '')
-            return ch
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old)
-    def key_pressed():
-        dr, _, _ = select.select([sys.stdin], [], [], 0)
-        return bool(dr)
-
 def clear():
     os.system('cls' if os.name == 'nt' else 'clear')
 
 class Menu:
-    def __init__(self, mapdata_file: str = "mapdata.json"):
+    def __init__(self, mapdata_file: str = "mapdata.json", progress_file: Optional[str] = None):
         """
-        mapdata_file: 경로 to JSON file for persistence
+        mapdata_file: 경로 to JSON file (맵 목록, 읽기 전용)
+        progress_file: 잠금 해제 기록 파일 (기본: mapdata_file과 같은 폴더의 progress.json)
         """
         self.mapdata_file = mapdata_file
-        # 파일에서 직접 맵 데이터 로드
+        # 이름과 메타데이터만 색인. 보드는 맵을 선택할 때 읽음
         try:
-            with open(self.mapdata_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            self.catalog = MapCatalog(self.mapdata_file)
         except Exception as e:
             print(f"맵 데이터 로드 실패: {e}")
             sys.exit(1)
+        if progress_file is None:
+            progress_file = os.path.join(os.path.dirname(os.path.abspath(mapdata_file)), "progress.json")
+        self.progress = ProgressStore(progress_file)
+        # 패딩/분류/첫 실행까지 끝낸 맵을 저장해 두는 캐시 (처음 맵을 실행할 때 생성)
+        self._map_cache = None
 
-        # JSON 구조를 내부 dict로 변환
-        self.maps: Dict[str, Dict[str, Any]] = {}
-        for m in data.get('maps', []):
-            name = m.get('name')
-            if not name:
-                continue
-            self.maps[name] = {
-                'data': m.get('data', []),
-                'locked': m.get('locked', True),
-                'returnValue': m.get('returnValue', None)
-            }
-        self.titles = list(self.maps.keys())
+        self.titles = self.catalog.titles
         self.current = 0
         # 화면에 표시할 윈도우 범위
         self.window_start = 0
         self.page_size = 10
+        # 메뉴와 게임이 함께 쓰는 키 입력기
+        self.keys = KeyReader()
+
+    @property
+    def map_cache(self):
+        if self._map_cache is None:
+            from mapcache import MapCache
+            self._map_cache = MapCache.beside(self.mapdata_file)
+        return self._map_cache
+
+    def _is_locked(self, title: str) -> bool:
+        return self.catalog.info(title).locked and not self.progress.is_unlocked(title)
 
     def _unlock_next(self):
         next_idx = self.current + 1
         if next_idx < len(self.titles):
             nxt = self.titles[next_idx]
-            if self.maps[nxt].get('locked', True):
-                self.maps[nxt]['locked'] = False
-                # 파일 업데이트
+            if self._is_locked(nxt):
+                # 진행 상황 파일만 갱신 (mapdata.json은 건드리지 않음)
                 try:
-                    with open(self.mapdata_file, 'r+', encoding='utf-8') as f:
-                        data = json.load(f)
-                        for entry in data.get('maps', []):
-                            if entry.get('name') == nxt:
-                                entry['locked'] = False
-                                break
-                        f.seek(0)
-                        json.dump(data, f, ensure_ascii=False, indent=2)
-                        f.truncate()
-                except Exception as e:
-                    print(f"맵 데이터 업데이트 실패: {e}")
+                    self.progress.unlock(nxt)
+                except OSError as e:
+                    print(f"진행 상황 저장 실패: {e}")
 
     def run(self):
+        with self.keys:
+            self._run()
+
+    def _run(self):
         total = len(self.titles)
         clear()
         while True:
@@ -101,16 +73,13 @@ class Menu:
             display = self.titles[self.window_start:end]
             for idx, title in enumerate(display):
                 global_idx = self.window_start + idx
-                item = self.maps[title]
                 sel = "▶" if global_idx == self.current else "  "
-                lock = " [Locked]" if item.get('locked', False) else ""
+                lock = " [Locked]" if self._is_locked(title) else ""
                 print(f"{sel} {title}{lock}                    ")         
             print("\n↑/↓: 이동    →: 선택    Q: 종료")
 
             # 키 입력 대기
-            while not key_pressed():
-                pass
-            ch = get_key()
+            ch = self.keys.read_key()
             if ch.lower() == 'q':
                 return
 
@@ -129,16 +98,19 @@ class Menu:
                         self.window_start = min(self.window_start + 1, max_start)
             elif ch == 'RIGHT':
                 # 현 위치 맵 실행
+                from game import Game
+                from journal import SessionJournal
                 while True:
                     title = self.titles[self.current]
-                    item = self.maps[title]
-                    if item.get('locked', False):
+                    if self._is_locked(title):
                         break
                     try:
-                        map_inst = Map(title,item['data'], item['returnValue'])
-                        r = Game(map_inst).start()
+                        map_inst = self.map_cache.load_map(self.catalog, title)
+                        journal = SessionJournal(SessionJournal.path_beside(self.mapdata_file, title))
+                        r = Game(map_inst, self.keys, journal).start()
                     except RecursionError as e:
-                        input(f"맵 로드 실패: {e}")
+                        with self.keys.paused():
+                            input(f"맵 로드 실패: {e}")
                         break
 
                     
@@ -148,7 +120,7 @@ class Menu:
                         break
                     # 다음 인덱스로 이동
                     # 다음 맵이 없거나 잠겨있으면 중단
-                    if self.current+1 >= total or self.maps[self.titles[self.current+1]].get('locked', False):
+                    if self.current+1 >= total or self._is_locked(self.titles[self.current+1]):
                         break
                     self.current += 1
                 if self.window_start+self.page_size <= self.current:
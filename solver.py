@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from headless import MOVES, find_map, load_maps, make_map
+from map_module import Map, MoveCache
+
+'''
+맵 풀이 검증 도구
+
+mapdata.json의 맵을 불러와 가능한 이동(U/D/L/R)을 너비 우선 탐색(BFS)으로 모두 시도하고,
+클리어 가능한지와 가장 짧은 풀이, 탐색 통계를 출력한다.
+- 보드 상태는 줄 문자열 튜플로 구분한다. (Map.move_and_execute 결과는 보드와 방향만으로 정해짐)
+- 클리어 판정은 MapManager와 같다: move_and_execute가 False를 반환하면 클리어
+- 무한루프(RecursionError)가 나는 이동은 MapManager처럼 이동 전 상태로 되돌리므로 건너뛴다.
+- 탐색 단계마다 frontier를 나누어 여러 프로세스에서 동시에 확장한다.
+
+사용 예
+    python solver.py                      # 모든 맵
+    python solver.py "맵 이름" 3 --workers 4 --max-states 100000
+'''
+
+Rows = Tuple[str, ...]
+
+# 프로세스마다 한 번만 받아 두는 맵 정보 (이름, 반환값, stepLimit)
+_spec: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    global _spec
+    _spec = spec
+
+
+def _expand(states: List[Rows]) -> List[Tuple[int, str, Rows, bool]]:
+    """
+    states의 각 보드에서 4방향으로 이동해 본 결과를 반환합니다.
+    (states 안의 인덱스, 이동 문자, 이동 후 보드, 클리어 여부)
+    보드가 그대로인 이동과 무한루프가 나는 이동은 제외합니다.
+    """
+    out: List[Tuple[int, str, Rows, bool]] = []
+    for i, rows in enumerate(states):
+        base = make_map(dict(_spec, data=rows))
+        # 상태마다 한 번씩만 방문하므로 이동 캐시는 쓰지 않음
+        base.move_cache = MoveCache(maxsize=0)
+        for key, (dx, dy) in MOVES.items():
+            map = base.snapshot()
+            try:
+                won = map.move_and_execute(dx, dy) is False
+            except RecursionError:
+                continue
+            child = tuple(map.board)
+            if won or child != rows:
+                out.append((i, key, child, won))
+    return out
+
+
+def _path(parents: Dict[Rows, Optional[Tuple[Rows, str]]], rows: Rows) -> str:
+    """parents를 거슬러 올라가 시작 상태에서 rows까지의 이동 문자열을 만듭니다."""
+    moves: List[str] = []
+    link = parents[rows]
+    while link is not None:
+        rows, key = link
+        moves.append(key)
+        link = parents[rows]
+    return ''.join(reversed(moves))
+
+
+def solve(entry: Dict[str, Any], max_states: int = 200000, max_depth: Optional[int] = None,
+          workers: Optional[int] = None, chunk_size: int = 64) -> Dict[str, Any]:
+    """
+    맵 하나를 BFS로 풉니다.
+    solvable은 풀이를 찾으면 True, 모든 상태를 다 봤는데 없으면 False,
+    max_states / max_depth 제한에 걸려 끝까지 보지 못했으면 None입니다.
+    (max_states는 탐색 단계가 끝날 때마다 확인하므로 마지막 단계만큼 넘을 수 있음)
+    workers=0이면 현재 프로세스에서만 탐색합니다.
+    """
+    started = time.perf_counter()
+    spec = {k: entry.get(k) for k in ('name', 'returnValue', 'stepLimit')}
+    report: Dict[str, Any] = {'map': entry['name'], 'solvable': None, 'solution': None}
+
+    root_map: Map = make_map(entry)
+    try:
+        cleared = root_map.initialize() is False
+    except RecursionError as e:
+        report.update(solvable=False, error=str(e))
+        return report
+    if cleared:
+        report.update(solvable=True, solution='', moves=0, states=1, depth=0,
+                      elapsed_s=round(time.perf_counter() - started, 3))
+        return report
+
+    root: Rows = tuple(root_map.board)
+    parents: Dict[Rows, Optional[Tuple[Rows, str]]] = {root: None}
+    frontier: List[Rows] = [root]
+    depth = 0
+    expanded = transitions = 0
+    solution: Optional[str] = None
+    exhausted = True
+
+    _init_worker(spec)
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(spec,)) if workers != 0 else None
+    try:
+        while frontier:
+            if max_depth is not None and depth >= max_depth:
+                exhausted = False
+                break
+            depth += 1
+            # frontier가 작으면 프로세스 간 전달 비용이 더 크므로 현재 프로세스에서 처리
+            if pool is not None and len(frontier) >= 2 * chunk_size:
+                chunks = [frontier[i:i + chunk_size] for i in range(0, len(frontier), chunk_size)]
+                results = [
+                    (offset * chunk_size + i, key, child, won)
+                    for offset, part in enumerate(pool.map(_expand, chunks))
+                    for i, key, child, won in part
+                ]
+            else:
+                results = _expand(frontier)
+            expanded += len(frontier)
+            transitions += len(results)
+
+            next_frontier: List[Rows] = []
+            for i, key, child, won in results:
+                parent = frontier[i]
+                if won:
+                    solution = _path(parents, parent) + key
+                    break
+                if child in parents:
+                    continue
+                parents[child] = (parent, key)
+                next_frontier.append(child)
+            if solution is not None:
+                break
+            frontier = next_frontier
+            if len(parents) >= max_states:
+                exhausted = False
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if solution is not None:
+        report.update(solvable=True, solution=solution, moves=len(solution))
+    elif exhausted and not frontier:
+        report['solvable'] = False
+    report.update(
+        states=len(parents),
+        expanded=expanded,
+        transitions=transitions,
+        depth=depth,
+        elapsed_s=round(time.perf_counter() - started, 3),
+    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="맵을 BFS로 풀어 클리어 가능 여부와 최단 풀이를 찾습니다.")
+    parser.add_argument('maps', nargs='*', help="맵 이름 또는 번호(0부터). 생략하면 모든 맵")
+    parser.add_argument('--mapdata', default="mapdata.json", help="맵 데이터 파일 (기본: mapdata.json)")
+    parser.add_argument('--max-states', type=int, default=200000, help="탐색할 최대 상태 수 (기본: 200000)")
+    parser.add_argument('--max-depth', type=int, help="최대 이동 횟수")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="프로세스 수 (0이면 단일 프로세스)")
+    args = parser.parse_args(argv)
+
+    try:
+        maps = load_maps(args.mapdata)
+        entries = [find_map(maps, key) for key in args.maps] if args.maps else list(maps.values())
+    except (OSError, ValueError, KeyError) as e:
+        print(f"맵 로드 실패: {e}", file=sys.stderr)
+        return 1
+
+    for entry in entries:
+        report = solve(entry, args.max_states, args.max_depth, args.workers)
+        print(json.dumps(report, ensure_ascii=False), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+'''
+실행 통계 (선택 기능)
+
+STATS.enabled가 True일 때만 기록하며, 꺼져 있으면 각 기록 지점은 플래그 확인만 한다.
+- 명령별 / 이동 단계별(move, interpret, classify) 호출 횟수, 총 시간, 최대 시간
+- while 반복 횟수, 이동 캐시 적중, MapManager 예측 적중/실패 횟수
+통계는 플레이어가 실제로 한 이동만 보여야 하므로, 미리 계산(예측) 중인 사본은
+기록을 바로 더하지 않고 자기 StatsBuffer에 모아 둔다.
+MapManager가 그 예측을 실제로 사용할 때만 merge로 더하고, 버려진 예측의 기록은 함께 버린다.
+
+사용 예
+    start = STATS.start()
+    ...측정할 작업...
+    STATS.stop('interpret', start)
+'''
+
+# 상태창에 표시할 통계 줄 수 (화면 위치가 흔들리지 않도록 항상 이 줄 수로 맞춤)
+OVERLAY_LINES = 10
+
+
+class Timing:
+    __slots__ = ('count', 'total', 'worst')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+
+class StatsBuffer:
+    """미리 계산 중인 사본의 기록. 예측이 사용될 때 Stats.merge로 더해짐"""
+    __slots__ = ('timings', 'counts')
+
+    def __init__(self):
+        self.timings: List[Tuple[str, float]] = []
+        self.counts: List[Tuple[str, int]] = []
+
+
+class Stats:
+    def __init__(self):
+        self.enabled = False
+        self.timings: Dict[str, Timing] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timings = {}
+            self.counts = {}
+
+    def toggle(self) -> bool:
+        """기록/표시를 켜거나 끕니다. 켤 때마다 이전 기록은 지웁니다."""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.reset()
+        return self.enabled
+
+    def start(self) -> Optional[float]:
+        """측정 시작 시각. 꺼져 있으면 None."""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, name: str, start: Optional[float], buffer: Optional[StatsBuffer] = None) -> None:
+        """start 이후 걸린 시간을 name 항목에 기록합니다. buffer가 있으면 거기에만 모아 둡니다."""
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if buffer is not None:
+            buffer.timings.append((name, elapsed))
+            return
+        with self._lock:
+            self._add_timing(name, elapsed)
+
+    def count(self, name: str, n: int = 1, buffer: Optional[StatsBuffer] = None) -> None:
+        """name 횟수를 n만큼 늘립니다. buffer가 있으면 거기에만 모아 둡니다."""
+        if not self.enabled:
+            return
+        if buffer is not None:
+            buffer.counts.append((name, n))
+            return
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def merge(self, buffer: Optional[StatsBuffer]) -> None:
+        """사용하기로 한 예측의 기록을 더합니다."""
+        if buffer is None or not self.enabled:
+            return
+        with self._lock:
+            for name, elapsed in buffer.timings:
+                self._add_timing(name, elapsed)
+            for name, n in buffer.counts:
+                self.counts[name] = self.counts.get(name, 0) + n
+
+    def _add_timing(self, name: str, elapsed: float) -> None:
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.count += 1
+        timing.total += elapsed
+        if elapsed > timing.worst:
+            timing.worst = elapsed
+
+    def overlay(self) -> List[str]:
+        """상태창에 붙일 OVERLAY_LINES줄. 총 시간이 큰 항목부터 보여 줍니다."""
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1].total, reverse=True)
+            counts = dict(self.counts)
+
+        hit, miss = counts.pop('예측 적중', 0), counts.pop('예측 실패', 0)
+        rate = f"{hit * 100 // (hit + miss)}%" if hit + miss else "-"
+        lines = [f"[통계] S:끄기   예측 적중률 {rate} ({hit}/{hit + miss})"]
+        if counts:
+            lines.append("  ".join(f"{name} {n}" for name, n in sorted(counts.items())))
+        for name, t in timings[:OVERLAY_LINES - len(lines)]:
+            lines.append(
+                f"{name:<12}{t.count:>7}회  합계 {t.total * 1000:9.2f}ms  최대 {t.worst * 1000:8.3f}ms"
+            )
+        return lines + [''] * (OVERLAY_LINES - len(lines))
+
+
+# 프로그램 전체에서 함께 쓰는 통계
+STATS = Stats()
@@ -1,12 +1,296 @@
 import re
-from typing import Any, Optional
+import operator
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 컴파일된 수식: 변수 프레임(슬롯 번호로 접근하는 list)을 받아 값을 돌려주는 함수
+Evaluator = Callable[[List[Any]], Any]
+
+
+# ───── 변수 슬롯 ─────
+# 변수 이름은 수식/대입을 컴파일할 때 전역 슬롯 번호로 바뀌고,
+# 실행 중에는 VariableMap.frame[슬롯]으로 바로 읽고 쓴다. (문자열 해싱 없음)
+_SLOTS: Dict[str, int] = {}
+_SLOT_NAMES: List[str] = []
+_SLOTS_LOCK = threading.Lock()   # 미리 계산 스레드에서도 컴파일하므로 새 슬롯 추가는 잠금
+
+
+class _Unset:
+    """아직 대입되지 않은 슬롯"""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return '<unset>'
+
+
+UNSET = _Unset()
+
+
+def slot_of(name: str) -> int:
+    """변수 이름의 슬롯 번호. 처음 보는 이름이면 새 슬롯을 만든다."""
+    slot = _SLOTS.get(name)
+    if slot is None:
+        with _SLOTS_LOCK:
+            slot = _SLOTS.get(name)
+            if slot is None:
+                slot = len(_SLOT_NAMES)
+                _SLOT_NAMES.append(name)
+                _SLOTS[name] = slot
+    return slot
+
+
+def is_variable_name(name: str) -> bool:
+    """대입 대상이 될 수 있는 이름인지 (글자로만 이루어짐)"""
+    return name.isalpha()
+
+
+def compile_targets(names: List[str]) -> Tuple[Tuple[int, ...], Optional[str]]:
+    """
+    대입 대상 이름들을 오른쪽부터 슬롯 번호로 바꾼다.
+    잘못된 이름을 만나면 거기서 멈추고 (그 앞까지의 슬롯, 잘못된 이름)을 반환한다.
+    (a=1=b=5 처럼 중간에 잘못된 대상이 있으면 그 오른쪽 변수까지만 대입된 뒤 오류)
+    """
+    slots: List[int] = []
+    for name in reversed(names):
+        if not is_variable_name(name):
+            return tuple(slots), name
+        slots.append(slot_of(name))
+    return tuple(slots), None
+
+# ───── 토큰 정의 (모듈 로드 시 한 번만 컴파일) ─────
+_TOKEN_SPEC = [
+    ('NUMBER',   r"\d+"),      # <- 양의 정수만
+    ('AND',      r"&&"),
+    ('OR',       r"\|\|"),
+    ('EQ',       r"=="),
+    ('NE',       r"!="),
+    ('LE',       r"<="),
+    ('GE',       r">="),
+    ('LT',       r"<"),
+    ('GT',       r">"),
+    ('PLUS',     r"\+"),
+    ('MINUS',    r"-"),
+    ('STAR',     r"\*"),
+    ('SLASH',    r"/"),
+    ('PERCENT',  r"%"),
+    ('LPAREN',   r"\("),
+    ('RPAREN',   r"\)"),
+    ('VAR',      r"[A-Za-z_]\w*"),
+    ('SKIP',     r"[ \t]+"),
+    ('MISMATCH', r"."),
+]
+_TOK_REGEX = re.compile('|'.join(f"(?P<{n}>{p})" for n, p in _TOKEN_SPEC))
+_INT_REGEX = re.compile(r"-?\d+")
+
+_BINARY_OPS = {
+    'STAR':    operator.mul,
+    'SLASH':   operator.truediv,
+    'PERCENT': operator.mod,
+    'PLUS':    operator.add,
+    'MINUS':   operator.sub,
+    'EQ':      operator.eq,
+    'NE':      operator.ne,
+    'LT':      operator.lt,
+    'GT':      operator.gt,
+    'LE':      operator.le,
+    'GE':      operator.ge,
+}
+
+
+def _tokenize(txt: str) -> list:
+    tokens = []
+    for mo in _TOK_REGEX.finditer(txt):
+        kind = mo.lastgroup
+        value = mo.group()
+        if kind == 'SKIP':
+            continue
+        if kind == 'MISMATCH':
+            raise SyntaxError(f"잘못된 토큰: {value!r}")
+        tokens.append((kind, value))
+    tokens.append(('EOF', ''))
+    return tokens
+
+
+def _const(value: Any) -> Evaluator:
+    return lambda frame: value
+
+
+def _load(frame: List[Any], slot: int) -> Any:
+    """frame[slot] 값. 프레임이 만들어진 뒤 생긴 슬롯이면 UNSET."""
+    try:
+        return frame[slot]
+    except IndexError:
+        return UNSET
+
+
+def _var(name: str) -> Evaluator:
+    slot = slot_of(name)
+
+    def evaluate(frame):
+        value = _load(frame, slot)
+        if value is UNSET:
+            raise NameError(f"정의되지 않은 변수: '{name}'")
+        return value
+    return evaluate
+
+
+def _unary(op: str, operand: Evaluator) -> Evaluator:
+    if op == 'PLUS':
+        return lambda frame: +operand(frame)
+    return lambda frame: -operand(frame)
+
+
+def _binary(op: str, left: Evaluator, right: Evaluator) -> Evaluator:
+    fn = _BINARY_OPS[op]
+    return lambda frame: fn(left(frame), right(frame))
+
+
+def _and(left: Evaluator, right: Evaluator) -> Evaluator:
+    # 왼쪽이 거짓이면 오른쪽은 평가하지 않음
+    return lambda frame: bool(left(frame)) and bool(right(frame))
+
+
+def _or(left: Evaluator, right: Evaluator) -> Evaluator:
+    # 왼쪽이 참이면 오른쪽은 평가하지 않음
+    return lambda frame: bool(left(frame)) or bool(right(frame))
+
+
+def _parse(tokens: list) -> Evaluator:
+    """토큰 목록을 재귀 하강으로 파싱하여 클로저 트리를 만든다."""
+    idx = 0
+    def peek(): return tokens[idx][0]
+    def advance():
+        nonlocal idx
+        tok = tokens[idx]
+        idx += 1
+        return tok
+
+    # primary → (expr) | NUMBER | VAR | +primary | -primary
+    def parse_primary():
+        tok = peek()
+        if tok == 'LPAREN':
+            advance()
+            node = parse_expr()
+            if peek() != 'RPAREN':
+                raise SyntaxError("')' 누락")
+            advance()
+            return node
+
+        t, v = advance()
+        if t == 'NUMBER':
+            return _const(int(v))
+        if t == 'VAR':
+            return _var(v)
+        if t in ('PLUS', 'MINUS'):
+            return _unary(t, parse_primary())
+        raise SyntaxError("잘못된 수식 요소")
+
+    # term   → primary ( (*|/|%) primary )*
+    def parse_term():
+        node = parse_primary()
+        while peek() in ('STAR', 'SLASH', 'PERCENT'):
+            op, _ = advance()
+            node = _binary(op, node, parse_primary())
+        return node
+
+    # arith  → term ( (+|-) term )*
+    def parse_arith():
+        node = parse_term()
+        while peek() in ('PLUS', 'MINUS'):
+            op, _ = advance()
+            node = _binary(op, node, parse_term())
+        return node
+
+    # compare → arith ( == | != | < | > | <= | >= arith )?
+    def parse_compare():
+        node = parse_arith()
+        if peek() in ('EQ', 'NE', 'LT', 'GT', 'LE', 'GE'):
+            op, _ = advance()
+            node = _binary(op, node, parse_arith())
+        return node
+
+    # and    → compare (&& compare)*
+    def parse_and():
+        node = parse_compare()
+        while peek() == 'AND':
+            advance()
+            node = _and(node, parse_compare())
+        return node
+
+    # expr   → and (|| and)*
+    def parse_expr():
+        node = parse_and()
+        while peek() == 'OR':
+            advance()
+            node = _or(node, parse_and())
+        return node
+
+    result = parse_expr()
+    if peek() != 'EOF':
+        raise SyntaxError("분석되지 않은 잔여 토큰 존재")
+    return result
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> Evaluator:
+    """
+    수식 문자열을 한 번만 파싱하여 재사용 가능한 평가 함수로 만든다.
+    변수 이름은 이때 슬롯 번호로 바뀐다.
+    결과는 수식 문자열을 키로 하는 LRU 캐시에 보관된다.
+    """
+    txt = text.strip()
+
+    # ───── 리터럴 ─────
+    if (txt.startswith('"') and txt.endswith('"')) or (txt.startswith("'") and txt.endswith("'")):
+        return _const(txt[1:-1])                          # 문자열
+    if _INT_REGEX.fullmatch(txt):
+        return _const(int(txt))                           # 정수
+
+    try:
+        return _parse(_tokenize(txt))
+    except SyntaxError as e:
+        message = e.msg
+
+    # 수식으로는 해석되지 않지만 변수명일 수는 있음 (예: 한글 변수)
+    if not is_variable_name(txt):
+        def fail(frame):
+            raise SyntaxError(message)
+        return fail
+    slot = slot_of(txt)
+
+    def evaluate(frame):
+        value = _load(frame, slot)
+        if value is UNSET:
+            raise SyntaxError(message)
+        return value
+    return evaluate
+
 
 class VariableMap:
+    """
+    interpret 한 번 동안의 변수 값.
+    값은 슬롯 번호로 접근하는 list(frame)에 저장한다.
+    """
+    __slots__ = ('frame',)
+
     def __init__(self):
-        self.variables: dict[str, Any] = {}
+        self.frame: List[Any] = [UNSET] * len(_SLOT_NAMES)
+
+    @property
+    def variables(self) -> Dict[str, Any]:
+        """대입된 변수들의 이름 → 값 (확인용 사본)"""
+        return {_SLOT_NAMES[slot]: value for slot, value in enumerate(self.frame) if value is not UNSET}
+
+    def store(self, slot: int, value: Any) -> None:
+        """slot에 값을 기록합니다. 프레임이 만들어진 뒤 생긴 슬롯이면 프레임을 늘립니다."""
+        frame = self.frame
+        if slot >= len(frame):
+            frame.extend([UNSET] * (len(_SLOT_NAMES) - len(frame)))
+        frame[slot] = value
 
     def set_variable(self, name: str, value: Any) -> None:
-        self.variables[name] = value
+        self.store(slot_of(name), value)
 
     def get_value(self, text: str) -> Optional[Any]:
         """
@@ -15,147 +299,9 @@ class VariableMap:
         - 변수명 조회
         - 수식 및 조건식: &&, ||, (), >, <, ==, !=, +, -, *, /, % 등
         문법 오류가 나면 SyntaxError를 발생시킨다.
+        수식은 compile_expression으로 한 번만 컴파일되고, 이후에는 현재 변수값만 조회한다.
         """
-        txt = text.strip()
-
-        # ───── 리터럴 및 변수 조회 ─────
-        if (txt.startswith('"') and txt.endswith('"')) or (txt.startswith("'") and txt.endswith("'")):
-            return txt[1:-1]                                  # 문자열
-        if re.fullmatch(r"-?\d+", txt):
-            return int(txt)                                   # 정수
-        if txt in self.variables:
-            return self.variables[txt]                        # 변수
-
-        # ───── 토큰화 ─────
-        token_spec = [
-            ('NUMBER',   r"\d+"),      # <- 양의 정수만
-            ('AND',      r"&&"),
-            ('OR',       r"\|\|"),
-            ('EQ',       r"=="),
-            ('NE',       r"!="),
-            ('LE',       r"<="),
-            ('GE',       r">="),
-            ('LT',       r"<"),
-            ('GT',       r">"),
-            ('PLUS',     r"\+"),
-            ('MINUS',    r"-"),
-            ('STAR',     r"\*"),
-            ('SLASH',    r"/"),
-            ('PERCENT',  r"%"),
-            ('LPAREN',   r"\("),
-            ('RPAREN',   r"\)"),
-            ('VAR',      r"[A-Za-z_]\w*"),
-            ('SKIP',     r"[ \t]+"),
-            ('MISMATCH', r"."),
-        ]
-        tok_regex = '|'.join(f"(?P<{n}>{p})" for n, p in token_spec)
-
-        tokens = []
-        for mo in re.finditer(tok_regex, txt):
-            kind = mo.lastgroup
-            value = mo.group()
-            if kind == 'SKIP':
-                continue
-            if kind == 'MISMATCH':
-                raise SyntaxError(f"잘못된 토큰: {value!r}")
-            tokens.append((kind, value))
-        tokens.append(('EOF', ''))
-
-        # ───── 파서 ─────
-        idx = 0
-        def peek(): return tokens[idx][0]
-        def advance():
-            nonlocal idx
-            tok = tokens[idx]
-            idx += 1
-            return tok
-
-        # primary → (expr) | NUMBER | VAR | +primary | -primary
-        def parse_primary():
-            tok = peek()
-            if tok == 'LPAREN':
-                advance()
-                val = parse_expr()
-                if peek() != 'RPAREN':
-                    raise SyntaxError("')' 누락")
-                advance()
-                return val
-
-            t, v = advance()
-            if t == 'NUMBER':
-                return int(v)
-            if t == 'VAR':
-                if v in self.variables:
-                    return self.variables[v]
-                else:
-                    raise NameError(f"정의되지 않은 변수: '{v}'")
-            if t in ('PLUS', 'MINUS'):
-                val = parse_primary()
-                return +val if t == 'PLUS' else -val
-            raise SyntaxError("잘못된 수식 요소")
-
-        # term   → primary ( (*|/|%) primary )*
-        def parse_term():
-            val = parse_primary()
-            while peek() in ('STAR', 'SLASH', 'PERCENT'):
-                op, _ = advance()
-                rhs = parse_primary()
-                if op == 'STAR':
-                    val = val * rhs
-                elif op == 'SLASH':
-                    val = val / rhs
-                else:  # PERCENT
-                    val = val % rhs
-            return val
-
-        # arith  → term ( (+|-) term )*
-        def parse_arith():
-            val = parse_term()
-            while peek() in ('PLUS', 'MINUS'):
-                op, _ = advance()
-                rhs = parse_term()
-                val = val + rhs if op == 'PLUS' else val - rhs
-            return val
-
-        # compare → arith ( == | != | < | > | <= | >= arith )?
-        def parse_compare():
-            left = parse_arith()
-            if peek() in ('EQ', 'NE', 'LT', 'GT', 'LE', 'GE'):
-                op, _ = advance()
-                right = parse_arith()
-                ops = {
-                    'EQ': left == right,
-                    'NE': left != right,
-                    'LT': left < right,
-                    'GT': left > right,
-                    'LE': left <= right,
-                    'GE': left >= right
-                }
-                return ops[op]
-            return left
-
-        # and    → compare (&& compare)*
-        def parse_and():
-            val = parse_compare()
-            while peek() == 'AND':
-                advance()
-                rhs = parse_compare()
-                val = bool(val) and bool(rhs)
-            return val
-
-        # expr   → and (|| and)*
-        def parse_expr():
-            val = parse_and()
-            while peek() == 'OR':
-                advance()
-                rhs = parse_and()
-                val = bool(val) or bool(rhs)
-            return val
-
-        result = parse_expr()
-        if peek() != 'EOF':
-            raise SyntaxError("분석되지 않은 잔여 토큰 존재")
-        return result
+        return compile_expression(text)(self.frame)
 
 # 사용 예:
 # vm = VariableMap()
@@ -0,0 +1,203 @@
+import codecs
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+'''
+터미널 키 입력 처리 (Windows / Unix)
+
+KeyReader를 with 문으로 열면 세션 동안 한 번만 터미널 모드를 바꾸고,
+read_key()는 입력이 올 때까지 잠들어 있으므로 대기 중에 CPU를 쓰지 않는다.
+(Unix: selectors, Windows: 콘솔 입력 핸들에 WaitForSingleObject)
+화살표 키 같은 이스케이프 시퀀스는 여러 번에 나뉘어 들어와도 모아서 하나의 키로 돌려준다.
+'''
+
+# 이스케이프 시퀀스(ESC 뒤 부분) → 키 이름
+KEY_NAMES = {
+    '[A': 'UP', '[B': 'DOWN', '[C': 'RIGHT', '[D': 'LEFT',
+    'OA': 'UP', 'OB': 'DOWN', 'OC': 'RIGHT', 'OD': 'LEFT',   # 애플리케이션 커서 모드
+}
+ESC = '\x1b'
+# ESC 뒤 나머지가 이 시간(초) 안에 오지 않으면 ESC 단독 입력으로 봄
+ESCAPE_TIMEOUT = 0.05
+
+
+def _split_escape(buffer: str):
+    """
+    buffer가 ESC로 시작할 때 완성된 시퀀스 길이를 반환한다.
+    아직 덜 들어왔으면 None.
+    """
+    if len(buffer) < 2:
+        return None
+    kind = buffer[1]
+    if kind == '[':
+        # CSI: ESC [ 매개변수... 종료 문자(0x40~0x7E)
+        for i in range(2, len(buffer)):
+            if '\x40' <= buffer[i] <= '\x7e':
+                return i + 1
+        return None
+    if kind == 'O':
+        # SS3: ESC O 문자
+        return 3 if len(buffer) >= 3 else None
+    return 1
+
+
+try:
+    import msvcrt
+    import ctypes
+    from ctypes import wintypes
+
+    _WIN_KEYS = {'H': 'UP', 'P': 'DOWN', 'K': 'LEFT', 'M': 'RIGHT'}
+
+    _kernel32 = ctypes.windll.kernel32
+    _kernel32.GetStdHandle.restype = wintypes.HANDLE
+    _kernel32.WaitForSingleObject.argtypes = (wintypes.HANDLE, wintypes.DWORD)
+    _kernel32.ReadConsoleInputW.argtypes = (wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD,
+                                            ctypes.POINTER(wintypes.DWORD))
+    _STD_INPUT_HANDLE = -10
+    _WAIT_OBJECT_0 = 0
+    _INPUT_RECORD_SIZE = 20     # sizeof(INPUT_RECORD)
+
+    def _wait_for_key(timeout: float) -> bool:
+        """
+        timeout(초) 안에 읽을 글자가 생기면 True.
+        콘솔 입력 핸들은 키를 뗄 때나 마우스/포커스 이벤트에도 신호 상태가 되므로,
+        글자가 아닌 이벤트는 하나씩 읽어 버리고 다시 기다린다.
+        """
+        handle = _kernel32.GetStdHandle(_STD_INPUT_HANDLE)
+        deadline = time.monotonic() + timeout
+        record = ctypes.create_string_buffer(_INPUT_RECORD_SIZE)
+        count = wintypes.DWORD()
+        while not msvcrt.kbhit():
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if remaining <= 0:
+                return False
+            if _kernel32.WaitForSingleObject(handle, remaining) != _WAIT_OBJECT_0:
+                return False
+            if not msvcrt.kbhit():
+                # kbhit이 거짓이면 버퍼에 글자 입력이 없으므로 맨 앞 이벤트는 버려도 됨
+                _kernel32.ReadConsoleInputW(handle, record, 1, ctypes.byref(count))
+        return True
+
+    class KeyReader:
+        """Windows 콘솔 입력. 콘솔은 따로 모드를 바꿀 필요가 없다."""
+
+        def __enter__(self) -> 'KeyReader':
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+        @contextmanager
+        def paused(self):
+            yield
+
+        def read_key(self, timeout: Optional[float] = None) -> Optional[str]:
+            """
+            키 하나를 읽는다. timeout(초) 안에 입력이 없으면 None.
+            timeout이 None이면 getwch에서 바로 기다리고, 0이면 kbhit만 한 번 확인한다.
+            """
+            if timeout is not None and not _wait_for_key(timeout):
+                return None
+            ch = msvcrt.getwch()
+            if ch in ('\xe0', '\x00'):  # 화살표 키
+                return _WIN_KEYS.get(msvcrt.getwch(), '')
+            return ch
+
+except ImportError:
+    import selectors
+    import termios
+    import tty
+
+    class KeyReader:
+        """
+        Unix 터미널 입력.
+        처음 with 문에 들어갈 때 cbreak 모드로 바꾸고 마지막으로 나올 때 되돌린다.
+        (raw 모드는 출력의 줄바꿈 처리까지 꺼서 렌더링이 깨지므로 cbreak 사용)
+        """
+
+        def __init__(self, stream=None):
+            self._stream = stream if stream is not None else sys.stdin
+            self._fd = self._stream.fileno()
+            self._depth = 0
+            self._saved = None
+            self._buffer = ''
+            self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._fd, selectors.EVENT_READ)
+
+        def __enter__(self) -> 'KeyReader':
+            if self._depth == 0:
+                self._set_mode()
+            self._depth += 1
+            return self
+
+        def __exit__(self, *exc) -> None:
+            self._depth -= 1
+            if self._depth == 0:
+                self._restore_mode()
+
+        def _set_mode(self) -> None:
+            try:
+                self._saved = termios.tcgetattr(self._fd)
+            except termios.error:
+                self._saved = None   # 터미널이 아님 (파이프 등)
+                return
+            tty.setcbreak(self._fd)
+
+        def _restore_mode(self) -> None:
+            if self._saved is not None:
+                termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+                self._saved = None
+
+        @contextmanager
+        def paused(self):
+            """input() 등 일반 입력이 필요할 때 잠시 원래 모드로 되돌린다."""
+            active = self._depth > 0
+            if active:
+                self._restore_mode()
+            try:
+                yield
+            finally:
+                if active:
+                    self._set_mode()
+
+        def _fill(self, timeout: Optional[float]) -> bool:
+            """입력을 기다려 버퍼에 추가한다. timeout 안에 입력이 없으면 False."""
+            if not self._selector.select(timeout):
+                return False
+            data = os.read(self._fd, 1024)
+            if not data:
+                raise EOFError("입력이 종료되었습니다")
+            self._buffer += self._decoder.decode(data)
+            return True
+
+        def read_key(self, timeout: Optional[float] = None) -> Optional[str]:
+            """
+            키 하나를 읽는다. 화살표 키는 'UP'/'DOWN'/'LEFT'/'RIGHT',
+            알 수 없는 이스케이프 시퀀스는 ''를 반환한다.
+            timeout(초) 안에 입력이 없으면 None.
+            """
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._buffer:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._fill(remaining):
+                    return None
+
+            if self._buffer[0] != ESC:
+                ch, self._buffer = self._buffer[0], self._buffer[1:]
+                return ch
+
+            # 이스케이프 시퀀스: 나뉘어 들어온 나머지를 잠깐 기다림
+            length = _split_escape(self._buffer)
+            while length is None:
+                if not self._fill(ESCAPE_TIMEOUT):
+                    length = len(self._buffer) if len(self._buffer) > 1 else 1
+                    break
+                length = _split_escape(self._buffer)
+            seq, self._buffer = self._buffer[:length], self._buffer[length:]
+            if seq == ESC:
+                return ESC
+            return KEY_NAMES.get(seq[1:], '')